@@ -7,6 +7,7 @@ from homeassistant.core import HomeAssistant
 from .common.consts import DEFAULT_NAME, DOMAIN, SUPPORTED_PLATFORMS
 from .managers.ha_config_manager import HAConfigManager
 from .managers.ha_coordinator import HACoordinator
+from .websocket_api import async_setup_websocket_api
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -27,6 +28,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
         hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
 
+        async_setup_websocket_api(hass)
+
         await hass.config_entries.async_forward_entry_setups(entry, SUPPORTED_PLATFORMS)
 
         await coordinator.async_config_entry_first_refresh()
@@ -4,20 +4,14 @@ Support for binary sensors.
 from __future__ import annotations
 
 import logging
+from typing import Any
 
 from homeassistant.components.binary_sensor import BinarySensorEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import (
-    ATTR_NAME,
-    ATTR_STATE,
-    STATE_ON,
-    STATE_UNAVAILABLE,
-    Platform,
-)
-from homeassistant.core import DOMAIN, HomeAssistant, callback
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant
 
-from .common.base_entity import IntegrationBaseEntity, async_setup_base_entry
-from .common.consts import ALLOWED_STATE_TRANSITIONS, ATTR_ATTRIBUTES
+from .common.base_entity import IntegrationAggregateEntity, async_setup_base_entry
 from .common.entity_descriptions import HABinarySensorEntityDescription
 from .managers.ha_coordinator import HACoordinator
 
@@ -38,7 +32,7 @@ async def async_setup_entry(
     )
 
 
-class HABinarySensorEntity(IntegrationBaseEntity, BinarySensorEntity):
+class HABinarySensorEntity(IntegrationAggregateEntity, BinarySensorEntity):
     """Representation of a sensor."""
 
     def __init__(
@@ -52,42 +46,5 @@ class HABinarySensorEntity(IntegrationBaseEntity, BinarySensorEntity):
 
         self._attr_device_class = entity_description.device_class
 
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        attributes = {"generated_by": DOMAIN}
-
-        entities = self.coordinator.get_related_entities(
-            self.area_id, self.entity_description
-        )
-
-        state = STATE_ON
-        entity_attributes = None
-
-        for entity in entities:
-            entity_state = entity.get(ATTR_STATE)
-            entity_name = entity.get(ATTR_NAME)
-
-            attributes[entity_name] = entity_state.state
-
-            state = self.get_binary_state(state, entity_state.state)
-
-            if entity_attributes is None:
-                entity_attributes = entity.get(ATTR_ATTRIBUTES)
-
-        if entity_attributes is not None:
-            attributes.update(entity_attributes)
-
-        self._attr_is_on = None if state == STATE_UNAVAILABLE else state
-        self._attr_extra_state_attributes = attributes
-
-        self.async_write_ha_state()
-
-    @staticmethod
-    def get_binary_state(current: str, state: str):
-        allowed_state_transitions = ALLOWED_STATE_TRANSITIONS.get(current, [])
-
-        if len(allowed_state_transitions) > 0 and state in allowed_state_transitions:
-            current = state
-
-        return current
+    def _set_state(self, state: Any, details: dict[str, Any]):
+        self._attr_is_on = state
@@ -0,0 +1,114 @@
+from collections import deque
+import sys
+
+from .consts import ATTR_AREAS, ATTR_MEMORY, ATTR_SIZE, ATTR_TRANSITIONS
+
+ActivityTransition = tuple[str, str | None, str, float]
+
+
+class ActivityHistory:
+    """Recent member transitions per area, bounded by a fixed size per area.
+
+    Transitions are kept as (entity_id, old_state, new_state, timestamp),
+    the memory used by the buffers is tracked on append and eviction.
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+        self._buffers: dict[str, deque[ActivityTransition]] = {}
+        self._memory = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def resize(self, size: int):
+        self._size = size
+
+        buffers = self._buffers
+
+        self.clear()
+
+        if size <= 0:
+            return
+
+        for area_id in buffers:
+            for transition in list(buffers[area_id])[-size:]:
+                self.append(area_id, *transition)
+
+    def clear(self):
+        self._buffers = {}
+        self._memory = 0
+
+    def append(
+        self,
+        area_id: str,
+        entity_id: str,
+        old_state: str | None,
+        new_state: str,
+        timestamp: float,
+    ):
+        if self._size <= 0:
+            return
+
+        buffer = self._buffers.get(area_id)
+
+        if buffer is None:
+            buffer = deque(maxlen=self._size)
+
+            self._buffers[area_id] = buffer
+            self._memory += sys.getsizeof(buffer)
+
+        if len(buffer) == self._size:
+            self._memory -= self._get_memory(buffer[0])
+
+        transition = (entity_id, old_state, new_state, timestamp)
+
+        buffer.append(transition)
+
+        self._memory += self._get_memory(transition)
+
+    def remove_area(self, area_id: str):
+        buffer = self._buffers.pop(area_id, None)
+
+        if buffer is None:
+            return
+
+        self._memory -= sys.getsizeof(buffer) + sum(
+            self._get_memory(transition) for transition in buffer
+        )
+
+    def get(
+        self, area_ids: list[str], since: float | None = None
+    ) -> list[tuple[str, ActivityTransition]]:
+        """Transitions of the areas, latest first."""
+        result = [
+            (area_id, transition)
+            for area_id in area_ids
+            for transition in self._buffers.get(area_id, [])
+            if since is None or transition[3] >= since
+        ]
+
+        result.sort(key=lambda item: item[1][3], reverse=True)
+
+        return result
+
+    def get_usage(self) -> dict[str, int]:
+        transitions = sum(len(buffer) for buffer in self._buffers.values())
+
+        result = {
+            ATTR_SIZE: self._size,
+            ATTR_AREAS: len(self._buffers),
+            ATTR_TRANSITIONS: transitions,
+            ATTR_MEMORY: self._memory,
+        }
+
+        return result
+
+    @staticmethod
+    def _get_memory(transition: ActivityTransition) -> int:
+        result = sys.getsizeof(transition) + sum(
+            sys.getsizeof(item) for item in transition
+        )
+
+        return result
@@ -0,0 +1,24 @@
+class AreaRollup:
+    """Running totals per area, rolled up to the ancestors of the area."""
+
+    def __init__(self):
+        self._totals: dict[str, float] = {}
+
+    def clear(self):
+        self._totals = {}
+
+    def apply(self, area_id: str, delta: float, ancestors: list[str]) -> list[str]:
+        if delta == 0:
+            return []
+
+        touched_areas = [area_id, *ancestors]
+
+        for touched_area_id in touched_areas:
+            self._totals[touched_area_id] = self._totals.get(touched_area_id, 0) + delta
+
+        return touched_areas
+
+    def get(self, area_id: str) -> float:
+        result = self._totals.get(area_id, 0)
+
+        return result
@@ -1,15 +1,19 @@
+from abc import abstractmethod
 import logging
 import sys
+from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.const import ATTR_STATE, Platform
+from homeassistant.core import CoreState, HomeAssistant, callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.restore_state import ExtraStoredData, RestoreEntity
+from homeassistant.helpers.start import async_at_started
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import slugify
 
 from ..managers.ha_coordinator import HACoordinator
-from .consts import ADD_COMPONENT_SIGNALS, DEFAULT_NAME, DOMAIN
+from .consts import ADD_COMPONENT_SIGNALS, DEFAULT_NAME, DOMAIN, SIGNAL_AREA_RENAMED
 from .entity_descriptions import BaseEntityDescription
 
 _LOGGER = logging.getLogger(__name__)
@@ -30,7 +34,7 @@ async def async_setup_base_entry(
         try:
             coordinator = hass.data[DOMAIN][entry.entry_id]
 
-            entity_descriptions = coordinator.get_entity_descriptions(platform)
+            entity_descriptions = coordinator.get_entity_descriptions(platform, area_id)
 
             entities = [
                 entity_type(hass, entity_description, coordinator, area_id)
@@ -108,6 +112,33 @@ class IntegrationBaseEntity(CoordinatorEntity):
                 f"Failed to initialize {entity_description}, Error: {ex}, Line: {line_number}"
             )
 
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+
+        if self.area_id is not None:
+            self.async_on_remove(
+                async_dispatcher_connect(
+                    self.hass, SIGNAL_AREA_RENAMED, self._handle_area_renamed
+                )
+            )
+
+    @callback
+    def _handle_area_renamed(self, entry_id: str, area_id: str):
+        if self.coordinator.config_manager.entry_id != entry_id:
+            return
+
+        if self.area_id != area_id:
+            return
+
+        device_info = self.coordinator.get_device_info(area_id)
+
+        self._attr_device_info = device_info
+        self._attr_name = self.coordinator.config_manager.get_entity_name(
+            self.entity_description, device_info
+        )
+
+        self.async_write_ha_state()
+
     @property
     def _local_coordinator(self) -> HACoordinator:
         return self.coordinator
@@ -115,3 +146,118 @@ class IntegrationBaseEntity(CoordinatorEntity):
     @property
     def data(self) -> dict | None:
         return self._data
+
+
+class AggregateStoredData(ExtraStoredData):
+    """Last aggregate of an area entity, restored on startup."""
+
+    def __init__(self, aggregate: dict[str, Any]):
+        self.aggregate = aggregate
+
+    def as_dict(self) -> dict[str, Any]:
+        return self.aggregate
+
+
+class IntegrationAggregateEntity(IntegrationBaseEntity, RestoreEntity):
+    """Area entity presenting the aggregate of an entity rule.
+
+    While HA is starting, the last aggregate is restored and kept until one of
+    the members is available, updates are written only when the aggregate changed.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entity_description: BaseEntityDescription,
+        coordinator: HACoordinator,
+        area_id: str | None,
+    ):
+        super().__init__(hass, entity_description, coordinator, area_id)
+
+        self._aggregate: dict[str, Any] | None = None
+        self._is_restored = False
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+
+        if self.area_id is None:
+            return
+
+        self.async_on_remove(
+            self.coordinator.async_add_aggregate_listener(
+                self.area_id,
+                self.entity_description.key,
+                self._handle_coordinator_update,
+            )
+        )
+
+        aggregate = self._get_aggregate()
+
+        if self.hass.state != CoreState.running:
+            last_extra_data = await self.async_get_last_extra_data()
+
+            if last_extra_data is not None:
+                aggregate = last_extra_data.as_dict()
+                self._is_restored = True
+
+                self.async_on_remove(
+                    async_at_started(self.hass, self._async_handle_started)
+                )
+
+                _LOGGER.debug(f"Restored {self.entity_id}, Aggregate: {aggregate}")
+
+        self._set_aggregate(aggregate)
+
+    @callback
+    def _async_handle_started(self, _hass: HomeAssistant):
+        self._is_restored = False
+
+        self._handle_coordinator_update()
+
+    @property
+    def extra_restore_state_data(self) -> ExtraStoredData | None:
+        if self._aggregate is None:
+            return None
+
+        return AggregateStoredData(self._aggregate)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        aggregate = self._get_aggregate()
+
+        if aggregate == self._aggregate:
+            return
+
+        if self._is_restored:
+            if aggregate is None or aggregate.get(ATTR_STATE) is None:
+                return
+
+            self._is_restored = False
+
+        self._set_aggregate(aggregate)
+
+        self.async_write_ha_state()
+
+    def _get_aggregate(self) -> dict[str, Any] | None:
+        result = self.coordinator.get_aggregate(self.area_id, self.entity_description)
+
+        return result
+
+    def _set_aggregate(self, aggregate: dict[str, Any] | None):
+        self._aggregate = aggregate
+
+        attributes = {"generated_by": DOMAIN}
+        details = {} if aggregate is None else dict(aggregate)
+
+        state = details.pop(ATTR_STATE, None)
+
+        self._set_state(state, details)
+
+        attributes.update(details)
+
+        self._attr_extra_state_attributes = attributes
+
+    @abstractmethod
+    def _set_state(self, state: Any, details: dict[str, Any]):
+        """Set the state of the entity, consumed details are removed."""
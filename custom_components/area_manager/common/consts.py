@@ -2,15 +2,17 @@
 Support for Constants.
 """
 from datetime import timedelta
+from typing import Any
 
 import voluptuous as vol
 
 from homeassistant.const import (
+    ATTR_AREA_ID,
+    ATTR_DEVICE_CLASS,
     ATTR_DOMAIN,
     ATTR_NAME,
-    STATE_OFF,
-    STATE_ON,
-    STATE_UNAVAILABLE,
+    ATTR_SERVICE,
+    ATTR_SERVICE_DATA,
     EntityCategory,
     Platform,
 )
@@ -35,11 +37,50 @@ ATTR_INCLUDE_NESTED = "include_nested"
 ATTR_VALUES = "values"
 ATTR_NESTED = "nested"
 ATTR_PARENT = "parent"
+ATTR_AGGREGATION = "aggregation"
+ATTR_HOLD_TIME = "hold_time"
+ATTR_FILTER = "filter"
+ATTR_LAST_ACTIVITY = "last_activity"
+ATTR_OCCUPIED_UNTIL = "occupied_until"
+ATTR_ACTIVE_MEMBERS = "active_members"
+ATTR_MEMBERS = "members"
+ATTR_QUERY = "query"
+ATTR_RULE = "rule"
+ATTR_RULES = "rules"
+ATTR_AREAS = "areas"
+ATTR_OFFSET = "offset"
+ATTR_LIMIT = "limit"
+ATTR_TOTAL = "total"
+ATTR_ITEMS = "items"
+ATTR_FILE_NAME = "file_name"
+ATTR_SPEED = "speed"
+ATTR_EVENTS = "events"
+ATTR_DURATION = "duration"
+ATTR_THROUGHPUT = "throughput"
+ATTR_LOOP_LAG = "loop_lag"
+ATTR_LATENCY = "latency"
+ATTR_SINCE = "since"
+ATTR_SIZE = "size"
+ATTR_TRANSITIONS = "transitions"
+ATTR_MEMORY = "memory"
+ATTR_OLD_STATE = "old_state"
+ATTR_NEW_STATE = "new_state"
+ATTR_LAST_CHANGED = "last_changed"
+ATTR_AGGREGATES = "aggregates"
+ATTR_DRY_RUN = "dry_run"
+ATTR_SKIPPED = "skipped"
+ATTR_OVERWRITE = "overwrite"
 
 CONF_NESTED_AREA_ID = "nested_area_id"
 
+EVENT_AGGREGATES_CHANGED = f"{DOMAIN}_aggregates_changed"
+EVENT_DATA_CHANGES = "changes"
+EVENT_DATA_OLD = "old"
+EVENT_DATA_NEW = "new"
+
 SIGNAL_AREA_LOADED = f"{DOMAIN}_SIGNAL_AREA_LOADED"
 SIGNAL_INTEGRATION_LOADED = f"{DOMAIN}_SIGNAL_INTEGRATION_LOADED"
+SIGNAL_AREA_RENAMED = f"{DOMAIN}_SIGNAL_AREA_RENAMED"
 
 ADD_COMPONENT_SIGNALS = [SIGNAL_AREA_LOADED, SIGNAL_INTEGRATION_LOADED]
 
@@ -47,25 +88,102 @@ DEFAULT_UPDATE_API_INTERVAL = timedelta(seconds=1)
 DEFAULT_UPDATE_ENTITIES_INTERVAL = timedelta(seconds=1)
 DEFAULT_HEARTBEAT_INTERVAL = timedelta(seconds=50)
 DEFAULT_CONSIDER_AWAY_INTERVAL = timedelta(minutes=3)
+DEFAULT_OCCUPANCY_HOLD_TIME = timedelta(minutes=5)
+DEFAULT_BATCH_WINDOW = 0.0
+DEFAULT_ACTIVITY_HISTORY_SIZE = 100
+MAX_ACTIVITY_HISTORY_SIZE = 10000
 
 ENTITY_CONFIG_ENTRY_ID = "entry_id"
 
 STORAGE_DATA_FILE_CONFIG = "config"
+STORAGE_DATA_FILE_SNAPSHOT = "snapshot"
+STORAGE_DATA_FILE_JOURNAL = "journal"
 
-STORAGE_DATA_FILES = [STORAGE_DATA_FILE_CONFIG]
+STORAGE_DATA_FILES = [
+    STORAGE_DATA_FILE_CONFIG,
+    STORAGE_DATA_FILE_SNAPSHOT,
+    STORAGE_DATA_FILE_JOURNAL,
+]
 STORAGE_DATA_AREA_PARENTS = "parents"
 STORAGE_DATA_AREA_DETAILS = "details"
 STORAGE_DATA_AREA_ENTITIES = "entities"
 STORAGE_DATA_AREA_ATTRIBUTES = "attributes"
+STORAGE_DATA_AREA_GROUPS = "groups"
+STORAGE_DATA_SETTINGS = "settings"
+
+SETTING_ACTIVITY_HISTORY_SIZE = "activity_history_size"
 
 DEFAULT_ENTRY_ID = STORAGE_DATA_FILE_CONFIG
 
+CONFIG_STORAGE_VERSION = 1
+CONFIG_STORAGE_MINOR_VERSION = 2
+CONFIG_JOURNAL_COMPACTION_THRESHOLD = 100
+
+JOURNAL_SECTION = "section"
+JOURNAL_KEY = "key"
+JOURNAL_VALUE = "value"
+JOURNAL_VERSION = "version"
+
+OPTION_INHERIT = "inherit"
+
+AREA_GROUP_PREFIX = "group"
+
+SNAPSHOT_FINGERPRINT = "fingerprint"
+SNAPSHOT_CONFIG_FINGERPRINT = "config_fingerprint"
+SNAPSHOT_DEVICE_ENTITIES = "device_entities"
+SNAPSHOT_MEMBERSHIPS = "memberships"
+SNAPSHOT_ENTITY_MEMBERSHIPS = "entity_memberships"
+SNAPSHOT_SAVE_DELAY = 10
+
 API_DATA_LAST_UPDATE = "lastUpdate"
 
 SERVICE_SET_ATTRIBUTE = "set_attribute"
 SERVICE_REMOVE_ATTRIBUTE = "remove_attribute"
 SERVICE_SET_ENTITY = "set_entity"
 SERVICE_REMOVE_ENTITY = "remove_entity"
+SERVICE_SET_GROUP = "set_group"
+SERVICE_REMOVE_GROUP = "remove_group"
+SERVICE_QUERY = "query"
+SERVICE_START_RECORDING = "start_recording"
+SERVICE_STOP_RECORDING = "stop_recording"
+SERVICE_REPLAY = "replay"
+SERVICE_SET_ACTIVITY_HISTORY = "set_activity_history"
+SERVICE_CONTROL = "control"
+
+CONTROL_BATCH_SIZE = 100
+
+DEFAULT_RECORDING_FILE_NAME = f"{DOMAIN}.recording.jsonl"
+RECORDING_DIRECTORY = "recordings"
+RECORDING_FILE_SUFFIX = ".jsonl"
+MAX_RECORDING_EVENTS = 100000
+RECORDING_FLUSH_SIZE = 1000
+RECORDING_TIME = "time"
+RECORDING_EVENT_TYPE = "event_type"
+RECORDING_DATA = "data"
+REPLAY_LOOP_LAG_INTERVAL = 0.05
+REPLAY_PERCENTILES = [50, 95, 99]
+
+QUERY_AREAS = "areas"
+QUERY_MEMBERS = "members"
+QUERY_RULES = "rules"
+QUERY_ACTIVITY = "activity"
+
+QUERIES = [QUERY_AREAS, QUERY_MEMBERS, QUERY_RULES, QUERY_ACTIVITY]
+
+DEFAULT_QUERY_LIMIT = 100
+MAX_QUERY_LIMIT = 1000
+
+TEMPLATE_NESTED_AREAS = "nested_areas"
+TEMPLATE_NESTED_AREA_ENTITIES = "nested_area_entities"
+TEMPLATE_AREA_ATTRIBUTE = "area_attribute"
+TEMPLATE_FUNCTIONS_MIN_VERSION = (2023, 7)
+TEMPLATE_FUNCTIONS_MAX_VERSION = (2023, 12)
+
+WS_COMMAND_AREAS = f"{DOMAIN}/{QUERY_AREAS}"
+WS_COMMAND_MEMBERS = f"{DOMAIN}/{QUERY_MEMBERS}"
+WS_COMMAND_RULES = f"{DOMAIN}/{QUERY_RULES}"
+WS_COMMAND_ACTIVITY = f"{DOMAIN}/{QUERY_ACTIVITY}"
+WS_COMMAND_SUBSCRIBE_AGGREGATES = f"{DOMAIN}/subscribe_aggregates"
 
 ENTITY_PLATFORMS = [
     Platform.BINARY_SENSOR,
@@ -77,6 +195,22 @@ ENTITY_PLATFORMS = [
 SUPPORTED_PLATFORMS = ENTITY_PLATFORMS.copy()
 SUPPORTED_PLATFORMS.append(Platform.SELECT)
 
+AGGREGATION_OCCUPANCY = "occupancy"
+AGGREGATION_SUM = "sum"
+AGGREGATION_AVERAGE = "average"
+
+AGGREGATIONS = {
+    Platform.BINARY_SENSOR: [AGGREGATION_OCCUPANCY],
+    Platform.SENSOR: [AGGREGATION_SUM, AGGREGATION_AVERAGE],
+}
+
+AGGREGATION_DEVICE_CLASSES = {
+    AGGREGATION_OCCUPANCY: ["motion", "occupancy", "presence"],
+    AGGREGATION_SUM: ["power", "energy"],
+}
+
+SUM_PRECISION = 3
+
 SERVICE_SCHEMA_SET_ATTRIBUTE = vol.Schema(
     {
         vol.Required(ATTR_NAME): cv.string,
@@ -84,6 +218,71 @@ SERVICE_SCHEMA_SET_ATTRIBUTE = vol.Schema(
     }
 )
 
+RULE_FILTER_AND = "and"
+RULE_FILTER_OR = "or"
+RULE_FILTER_NOT = "not"
+
+RULE_FIELD_INTEGRATION = "integration"
+RULE_FIELD_MANUFACTURER = "manufacturer"
+RULE_FIELD_MODEL = "model"
+RULE_FIELD_LABEL = "label"
+RULE_FIELD_DISABLED = "disabled"
+RULE_FIELD_HIDDEN = "hidden"
+RULE_FIELD_ENTITY_ID = "entity_id"
+RULE_FIELD_ENTITY_ID_REGEX = "entity_id_regex"
+
+RULE_FILTER_OPERATORS = [RULE_FILTER_AND, RULE_FILTER_OR, RULE_FILTER_NOT]
+RULE_FILTER_DEVICE_FIELDS = [RULE_FIELD_MANUFACTURER, RULE_FIELD_MODEL]
+
+
+def _is_regex_string(value: Any) -> str:
+    cv.is_regex(value)
+
+    return cv.string(value)
+
+
+RULE_FILTER_CONDITION_SCHEMA = vol.Schema(
+    {
+        vol.Optional(RULE_FIELD_INTEGRATION): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(RULE_FIELD_MANUFACTURER): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(RULE_FIELD_MODEL): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(RULE_FIELD_LABEL): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(RULE_FIELD_DISABLED): cv.boolean,
+        vol.Optional(RULE_FIELD_HIDDEN): cv.boolean,
+        vol.Optional(RULE_FIELD_ENTITY_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(RULE_FIELD_ENTITY_ID_REGEX): vol.All(
+            cv.ensure_list, [_is_regex_string]
+        ),
+    }
+)
+
+
+def rule_filter(value: Any) -> dict:
+    """Validate a rule filter, conditions combined with and / or / not."""
+    if not isinstance(value, dict) or len(value) == 0:
+        raise vol.Invalid("Rule filter must be a non empty dictionary")
+
+    operators = [key for key in value if key in RULE_FILTER_OPERATORS]
+
+    if len(operators) == 0:
+        return RULE_FILTER_CONDITION_SCHEMA(value)
+
+    if len(value) > 1:
+        raise vol.Invalid(f"Rule filter operator '{operators[0]}' must be alone")
+
+    operator = operators[0]
+
+    if operator == RULE_FILTER_NOT:
+        return {operator: rule_filter(value[operator])}
+
+    conditions = cv.ensure_list(value[operator])
+
+    if len(conditions) == 0:
+        raise vol.Invalid(f"Rule filter operator '{operator}' requires conditions")
+
+    return {operator: [rule_filter(condition) for condition in conditions]}
+
+
 SERVICE_SCHEMA_SET_ENTITY = vol.Schema(
     {
         vol.Required(ATTR_NAME): cv.string,
@@ -91,18 +290,103 @@ SERVICE_SCHEMA_SET_ENTITY = vol.Schema(
             [Platform.SENSOR, Platform.BINARY_SENSOR, Platform.LIGHT, Platform.SWITCH]
         ),
         vol.Required(ATTR_INCLUDE_NESTED): cv.boolean,
-        vol.Required(ATTR_ATTRIBUTE): cv.string,
-        vol.Required(ATTR_VALUES): vol.All(cv.ensure_list, [cv.string]),
+        vol.Inclusive(ATTR_ATTRIBUTE, ATTR_ATTRIBUTES): cv.string,
+        vol.Inclusive(ATTR_VALUES, ATTR_ATTRIBUTES): vol.All(
+            cv.ensure_list, [cv.string]
+        ),
+        vol.Optional(ATTR_FILTER): rule_filter,
+        vol.Optional(ATTR_AGGREGATION): vol.In(
+            [
+                aggregation
+                for domain_aggregations in AGGREGATIONS.values()
+                for aggregation in domain_aggregations
+            ]
+        ),
+        vol.Optional(ATTR_HOLD_TIME): cv.positive_int,
     }
 )
 
 SERVICE_SCHEMA_REMOVE_AREA_X = vol.Schema({vol.Required(ATTR_NAME): cv.string})
 
-ALLOWED_STATE_TRANSITIONS = {
-    STATE_OFF: [STATE_ON, STATE_UNAVAILABLE],
-    STATE_ON: [STATE_UNAVAILABLE],
+SERVICE_SCHEMA_SET_GROUP = vol.Schema(
+    {
+        vol.Required(ATTR_NAME): cv.string,
+        vol.Required(ATTR_AREA_ID): vol.All(cv.ensure_list, [cv.string]),
+    }
+)
+
+QUERY_FILTERS_SCHEMA = {
+    vol.Optional(ATTR_AREA_ID): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional(ATTR_INCLUDE_NESTED, default=False): cv.boolean,
+    vol.Optional(ATTR_DOMAIN): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional(ATTR_DEVICE_CLASS): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional(ATTR_RULE): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional(ATTR_ATTRIBUTES): {
+        cv.string: vol.All(cv.ensure_list, [cv.string]),
+    },
+    vol.Optional(ATTR_SINCE): cv.datetime,
+    vol.Optional(ATTR_OFFSET, default=0): cv.positive_int,
+    vol.Optional(ATTR_LIMIT, default=DEFAULT_QUERY_LIMIT): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=MAX_QUERY_LIMIT)
+    ),
 }
 
+SUBSCRIBE_AGGREGATES_SCHEMA = {
+    vol.Optional(ATTR_AREA_ID): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional(ATTR_INCLUDE_NESTED, default=False): cv.boolean,
+    vol.Optional(ATTR_RULE): vol.All(cv.ensure_list, [cv.string]),
+}
+
+SERVICE_SCHEMA_QUERY = vol.Schema(
+    {vol.Required(ATTR_QUERY): vol.In(QUERIES), **QUERY_FILTERS_SCHEMA}
+)
+
+SERVICE_SCHEMA_SET_ACTIVITY_HISTORY = vol.Schema(
+    {
+        vol.Required(ATTR_SIZE): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=MAX_ACTIVITY_HISTORY_SIZE)
+        )
+    }
+)
+
+SERVICE_SCHEMA_CONTROL = vol.Schema(
+    {
+        vol.Required(ATTR_DOMAIN): vol.In(ENTITY_PLATFORMS),
+        vol.Required(ATTR_SERVICE): cv.string,
+        vol.Required(ATTR_AREA_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_INCLUDE_NESTED, default=False): cv.boolean,
+        vol.Optional(ATTR_DEVICE_CLASS): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_RULE): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_ATTRIBUTES): {
+            cv.string: vol.All(cv.ensure_list, [cv.string]),
+        },
+        vol.Optional(ATTR_SERVICE_DATA, default={}): dict,
+        vol.Optional(ATTR_DRY_RUN, default=False): cv.boolean,
+    }
+)
+
+RECORDING_FILE_NAME_SCHEMA = vol.All(cv.string, vol.Match(r"^[\w-]+(\.[\w-]+)*$"))
+
+SERVICE_SCHEMA_START_RECORDING = vol.Schema(
+    {
+        vol.Optional(
+            ATTR_FILE_NAME, default=DEFAULT_RECORDING_FILE_NAME
+        ): RECORDING_FILE_NAME_SCHEMA,
+        vol.Optional(ATTR_OVERWRITE, default=False): cv.boolean,
+    }
+)
+
+SERVICE_SCHEMA_REPLAY = vol.Schema(
+    {
+        vol.Optional(
+            ATTR_FILE_NAME, default=DEFAULT_RECORDING_FILE_NAME
+        ): RECORDING_FILE_NAME_SCHEMA,
+        vol.Optional(ATTR_SPEED, default=1): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+    }
+)
+
 DEFAULT_ENTITY_DESCRIPTIONS = [
     HASelectEntityDescription(
         key=ATTR_PARENT,
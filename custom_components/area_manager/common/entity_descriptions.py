@@ -1,12 +1,19 @@
 from dataclasses import dataclass
 from typing import Any
 
-from homeassistant.components.binary_sensor import BinarySensorEntityDescription
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntityDescription,
+)
 from homeassistant.components.light import LightEntityDescription
 from homeassistant.components.select import SelectEntityDescription
-from homeassistant.components.sensor import SensorEntityDescription
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntityDescription,
+    SensorStateClass,
+)
 from homeassistant.components.switch import SwitchEntityDescription
-from homeassistant.const import Platform
+from homeassistant.const import ATTR_DEVICE_CLASS, Platform, UnitOfEnergy, UnitOfPower
 from homeassistant.helpers.entity import EntityDescription
 from homeassistant.util import slugify
 
@@ -17,6 +24,9 @@ class BaseEntityDescription(EntityDescription):
     attributes: dict[str, list[Any]] | None = None
     include_nested: bool = False
     config_key: str | None = None
+    aggregation: str | None = None
+    hold_time: int | None = None
+    rule_filter: dict | None = None
 
 
 @dataclass(slots=True)
@@ -51,6 +61,10 @@ def get_entity_description(
     name: str,
     include_nested: bool,
     attributes: dict[str, list[Any]] | None = None,
+    aggregation: str | None = None,
+    hold_time: int | None = None,
+    rule_filter: dict | None = None,
+    is_sum: bool = False,
 ):
     if platform == Platform.SELECT:
         return HASelectEntityDescription(
@@ -58,6 +72,7 @@ def get_entity_description(
             name=name,
             attributes=attributes,
             include_nested=include_nested,
+            rule_filter=rule_filter,
         )
     elif platform == Platform.LIGHT:
         return HALightEntityDescription(
@@ -65,6 +80,7 @@ def get_entity_description(
             name=name,
             attributes=attributes,
             include_nested=include_nested,
+            rule_filter=rule_filter,
         )
     elif platform == Platform.SWITCH:
         return HASwitchEntityDescription(
@@ -72,21 +88,59 @@ def get_entity_description(
             name=name,
             attributes=attributes,
             include_nested=include_nested,
+            rule_filter=rule_filter,
         )
     elif platform == Platform.SENSOR:
+        if not is_sum:
+            return HASensorEntityDescription(
+                key=slugify(name),
+                name=name,
+                attributes=attributes,
+                include_nested=include_nested,
+                rule_filter=rule_filter,
+                aggregation=aggregation,
+                state_class=None,
+            )
+
+        device_classes = (
+            [] if attributes is None else attributes.get(ATTR_DEVICE_CLASS, [])
+        )
+
+        if SensorDeviceClass.ENERGY in device_classes:
+            device_class = SensorDeviceClass.ENERGY
+            unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+            state_class = SensorStateClass.TOTAL
+
+        else:
+            device_class = SensorDeviceClass.POWER
+            unit_of_measurement = UnitOfPower.WATT
+            state_class = SensorStateClass.MEASUREMENT
+
         return HASensorEntityDescription(
             key=slugify(name),
             name=name,
             attributes=attributes,
             include_nested=include_nested,
-            state_class=None,
+            rule_filter=rule_filter,
+            aggregation=aggregation,
+            device_class=device_class,
+            native_unit_of_measurement=unit_of_measurement,
+            state_class=state_class,
         )
     elif platform == Platform.BINARY_SENSOR:
+        device_class = (
+            BinarySensorDeviceClass.OCCUPANCY if aggregation is not None else None
+        )
+
         return HABinarySensorEntityDescription(
             key=slugify(name),
             name=name,
             attributes=attributes,
             include_nested=include_nested,
+            rule_filter=rule_filter,
+            aggregation=aggregation,
+            hold_time=hold_time,
+            device_class=device_class,
         )
     else:
         return BaseEntityDescription(
@@ -94,4 +148,5 @@ def get_entity_description(
             name=name,
             attributes=attributes,
             include_nested=include_nested,
+            rule_filter=rule_filter,
         )
@@ -1,3 +1,18 @@
 class SystemAttributeError(Exception):
     def __init__(self, key: str):
         self.error = f"Failed to modify attribute '{key}', Error: used by the system"
+
+
+class UnsupportedAggregationError(Exception):
+    def __init__(self, domain: str, aggregation: str):
+        self.error = (
+            f"Failed to set aggregation '{aggregation}' for domain '{domain}', "
+            "Error: not supported"
+        )
+
+
+class RecordingExistsError(Exception):
+    def __init__(self, file_name: str):
+        self.error = (
+            f"Failed to start recording to '{file_name}', Error: file already exists"
+        )
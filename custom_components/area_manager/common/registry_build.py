@@ -0,0 +1,169 @@
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+import hashlib
+import json
+from typing import Any
+
+from homeassistant.const import ATTR_AREA_ID, ATTR_DOMAIN, ATTR_NAME
+from homeassistant.helpers.area_registry import AreaEntry
+from homeassistant.helpers.device_registry import DeviceEntry
+from homeassistant.helpers.entity_registry import RegistryEntry
+
+from .consts import (
+    ATTR_NESTED,
+    DOMAIN,
+    ENTITY_PLATFORMS,
+    RULE_FIELD_DISABLED,
+    RULE_FIELD_HIDDEN,
+    RULE_FIELD_INTEGRATION,
+    RULE_FIELD_LABEL,
+    RULE_FIELD_MANUFACTURER,
+    RULE_FIELD_MODEL,
+)
+from .registry_index import RegistryIndex
+
+
+@dataclass(frozen=True, slots=True)
+class RegistrySnapshot:
+    """Registry entries read by a full rebuild, safe to use off the event loop.
+
+    Registry entries are immutable, copying the containers is enough.
+    """
+
+    areas: tuple[AreaEntry, ...]
+    entities: tuple[RegistryEntry, ...]
+    devices: Mapping[str, DeviceEntry]
+    area_parents: Mapping[str, str]
+
+
+@dataclass(slots=True)
+class RegistryBuild:
+    """Indexes built from a registry snapshot, swapped in as a whole."""
+
+    areas: dict[str, dict] = field(default_factory=dict)
+    entities: dict[str, dict] = field(default_factory=dict)
+    entity_entries: dict[str, RegistryEntry] = field(default_factory=dict)
+    area_entities: dict[str, list[str]] = field(default_factory=dict)
+    device_entities: dict[str, list[str]] = field(default_factory=dict)
+    device_entity_ids: dict[str, set[str]] = field(default_factory=dict)
+    registry_index: RegistryIndex = field(default_factory=RegistryIndex)
+    fingerprint: str | None = None
+
+
+def build_registry(snapshot: RegistrySnapshot) -> RegistryBuild:
+    build = RegistryBuild(fingerprint=get_registry_fingerprint(snapshot))
+
+    for area in snapshot.areas:
+        build.areas[area.id] = {
+            ATTR_NAME: area.name,
+            ATTR_AREA_ID: area.id,
+            ATTR_NESTED: get_nested_areas(area.id, snapshot.area_parents),
+        }
+
+        build.area_entities[area.id] = []
+
+    for entity in snapshot.entities:
+        if entity.domain not in ENTITY_PLATFORMS:
+            continue
+
+        if entity.platform == DOMAIN:
+            continue
+
+        area_id = entity.area_id
+
+        if entity.area_id is None and entity.device_id is not None:
+            device = snapshot.devices.get(entity.device_id)
+            area_id = None if device is None else device.area_id
+
+            build.device_entities.setdefault(entity.device_id, []).append(
+                entity.entity_id
+            )
+
+        area = build.areas.get(area_id)
+
+        if area is None:
+            continue
+
+        entity_data = entity.as_partial_dict
+
+        entity_data[ATTR_AREA_ID] = area_id
+        entity_data[ATTR_NAME] = area.get(ATTR_NAME)
+        entity_data[ATTR_DOMAIN] = entity.domain
+
+        build.entities[entity.entity_id] = entity_data
+        build.entity_entries[entity.entity_id] = entity
+        build.area_entities[area_id].append(entity.entity_id)
+
+        if entity.device_id is not None:
+            build.device_entity_ids.setdefault(entity.device_id, set()).add(
+                entity.entity_id
+            )
+
+        build.registry_index.set_entity(
+            entity.entity_id, get_registry_index_fields(entity, snapshot.devices)
+        )
+
+    return build
+
+
+def get_registry_fingerprint(snapshot: RegistrySnapshot) -> str:
+    """Fingerprint of the registry fields used by the build and the rule filters."""
+    areas = sorted([area.id, area.name] for area in snapshot.areas)
+
+    entities = sorted(
+        [
+            entity.entity_id,
+            entity.area_id,
+            entity.device_id,
+            None
+            if entity.device_id not in snapshot.devices
+            else snapshot.devices[entity.device_id].area_id,
+            get_registry_index_fields(entity, snapshot.devices),
+        ]
+        for entity in snapshot.entities
+        if entity.domain in ENTITY_PLATFORMS and entity.platform != DOMAIN
+    )
+
+    result = get_fingerprint([areas, entities])
+
+    return result
+
+
+def get_fingerprint(data: Any) -> str:
+    content = json.dumps(data, sort_keys=True, default=str)
+
+    result = hashlib.sha1(content.encode()).hexdigest()
+
+    return result
+
+
+def get_registry_index_fields(
+    entity: RegistryEntry, devices: Mapping[str, DeviceEntry]
+) -> dict[str, list]:
+    device = None if entity.device_id is None else devices.get(entity.device_id)
+
+    fields = {
+        RULE_FIELD_INTEGRATION: [entity.platform],
+        RULE_FIELD_MANUFACTURER: [] if device is None else [device.manufacturer],
+        RULE_FIELD_MODEL: [] if device is None else [device.model],
+        RULE_FIELD_LABEL: list(getattr(entity, "labels", [])),
+        RULE_FIELD_DISABLED: [entity.disabled_by is not None],
+        RULE_FIELD_HIDDEN: [entity.hidden_by is not None],
+    }
+
+    return fields
+
+
+def get_nested_areas(
+    area_id: str, area_parents: Mapping[str, str], nested_areas=None
+) -> list[str]:
+    if nested_areas is None:
+        nested_areas = []
+
+    for area_config_id in area_parents:
+        if area_parents.get(area_config_id) == area_id:
+            nested_areas.append(area_config_id)
+
+            get_nested_areas(area_config_id, area_parents, nested_areas)
+
+    return nested_areas
@@ -0,0 +1,23 @@
+from dataclasses import dataclass, field
+
+
+@dataclass(slots=True)
+class RegistryDiff:
+    added: set[str] = field(default_factory=set)
+    removed: set[str] = field(default_factory=set)
+    changed: set[str] = field(default_factory=set)
+
+    @property
+    def has_changes(self) -> bool:
+        return len(self.added) + len(self.removed) + len(self.changed) > 0
+
+    @property
+    def has_structural_changes(self) -> bool:
+        return len(self.added) + len(self.removed) > 0
+
+    def __str__(self) -> str:
+        return (
+            f"Added: {len(self.added)}, "
+            f"Removed: {len(self.removed)}, "
+            f"Changed: {len(self.changed)}"
+        )
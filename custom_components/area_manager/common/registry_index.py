@@ -0,0 +1,61 @@
+from collections.abc import Hashable
+
+
+class RegistryIndex:
+    """Entity IDs indexed by the values of their registry fields."""
+
+    def __init__(self):
+        self._index: dict[str, dict[Hashable, set[str]]] = {}
+        self._entity_fields: dict[str, dict[str, list[Hashable]]] = {}
+
+    @property
+    def entity_ids(self) -> set[str]:
+        return set(self._entity_fields.keys())
+
+    def set_entity(self, entity_id: str, fields: dict[str, list[Hashable]]):
+        self.remove_entity(entity_id)
+
+        self._entity_fields[entity_id] = fields
+
+        for field in fields:
+            field_index = self._index.setdefault(field, {})
+
+            for value in fields[field]:
+                field_index.setdefault(value, set()).add(entity_id)
+
+    def remove_entity(self, entity_id: str):
+        fields = self._entity_fields.pop(entity_id, None)
+
+        if fields is None:
+            return
+
+        for field in fields:
+            field_index = self._index.get(field, {})
+
+            for value in fields[field]:
+                entity_ids = field_index.get(value)
+
+                if entity_ids is None:
+                    continue
+
+                entity_ids.discard(entity_id)
+
+                if len(entity_ids) == 0:
+                    field_index.pop(value)
+
+    def get(self, field: str, values: list[Hashable]) -> set[str]:
+        field_index = self._index.get(field, {})
+
+        result = set()
+
+        for value in values:
+            result.update(field_index.get(value, set()))
+
+        return result
+
+    def contains(self, entity_id: str, field: str, values: list[Hashable]) -> bool:
+        fields = self._entity_fields.get(entity_id, {})
+
+        result = any(value in values for value in fields.get(field, []))
+
+        return result
@@ -0,0 +1,169 @@
+from abc import ABC, abstractmethod
+import fnmatch
+import re
+
+from .consts import (
+    RULE_FIELD_DISABLED,
+    RULE_FIELD_ENTITY_ID,
+    RULE_FIELD_ENTITY_ID_REGEX,
+    RULE_FIELD_HIDDEN,
+    RULE_FILTER_AND,
+    RULE_FILTER_NOT,
+    RULE_FILTER_OR,
+)
+from .registry_index import RegistryIndex
+
+
+class RulePredicate(ABC):
+    """Condition of entity rule, resolved against the registry index."""
+
+    @abstractmethod
+    def matches(self, entity_id: str, index: RegistryIndex) -> bool:
+        """Whether the entity matches the condition."""
+
+    @abstractmethod
+    def evaluate(self, index: RegistryIndex) -> set[str]:
+        """All the indexed entities matching the condition."""
+
+
+class AllPredicate(RulePredicate):
+    def __init__(self, predicates: list[RulePredicate]):
+        self._predicates = predicates
+
+    def matches(self, entity_id: str, index: RegistryIndex) -> bool:
+        result = all(
+            predicate.matches(entity_id, index) for predicate in self._predicates
+        )
+
+        return result
+
+    def evaluate(self, index: RegistryIndex) -> set[str]:
+        result = self._predicates[0].evaluate(index)
+
+        for predicate in self._predicates[1:]:
+            if len(result) == 0:
+                break
+
+            result = result.intersection(predicate.evaluate(index))
+
+        return result
+
+
+class AnyPredicate(RulePredicate):
+    def __init__(self, predicates: list[RulePredicate]):
+        self._predicates = predicates
+
+    def matches(self, entity_id: str, index: RegistryIndex) -> bool:
+        result = any(
+            predicate.matches(entity_id, index) for predicate in self._predicates
+        )
+
+        return result
+
+    def evaluate(self, index: RegistryIndex) -> set[str]:
+        result = set()
+
+        for predicate in self._predicates:
+            result.update(predicate.evaluate(index))
+
+        return result
+
+
+class NotPredicate(RulePredicate):
+    def __init__(self, predicate: RulePredicate):
+        self._predicate = predicate
+
+    def matches(self, entity_id: str, index: RegistryIndex) -> bool:
+        result = not self._predicate.matches(entity_id, index)
+
+        return result
+
+    def evaluate(self, index: RegistryIndex) -> set[str]:
+        result = index.entity_ids.difference(self._predicate.evaluate(index))
+
+        return result
+
+
+class FieldPredicate(RulePredicate):
+    def __init__(self, field: str, values: list):
+        self._field = field
+        self._values = values
+
+    def matches(self, entity_id: str, index: RegistryIndex) -> bool:
+        result = index.contains(entity_id, self._field, self._values)
+
+        return result
+
+    def evaluate(self, index: RegistryIndex) -> set[str]:
+        result = index.get(self._field, self._values)
+
+        return result
+
+
+class PatternPredicate(RulePredicate):
+    """Entity ID patterns, compiled once, results cached per entity ID."""
+
+    def __init__(self, patterns: list[re.Pattern]):
+        self._patterns = patterns
+        self._results: dict[str, bool] = {}
+
+    def matches(self, entity_id: str, index: RegistryIndex) -> bool:
+        result = self._results.get(entity_id)
+
+        if result is None:
+            result = any(pattern.search(entity_id) for pattern in self._patterns)
+
+            self._results[entity_id] = result
+
+        return result
+
+    def evaluate(self, index: RegistryIndex) -> set[str]:
+        result = {
+            entity_id
+            for entity_id in index.entity_ids
+            if self.matches(entity_id, index)
+        }
+
+        return result
+
+
+def compile_rule_filter(rule_filter: dict) -> RulePredicate:
+    if RULE_FILTER_AND in rule_filter:
+        conditions = rule_filter[RULE_FILTER_AND]
+
+        return AllPredicate([compile_rule_filter(item) for item in conditions])
+
+    if RULE_FILTER_OR in rule_filter:
+        conditions = rule_filter[RULE_FILTER_OR]
+
+        return AnyPredicate([compile_rule_filter(item) for item in conditions])
+
+    if RULE_FILTER_NOT in rule_filter:
+        return NotPredicate(compile_rule_filter(rule_filter[RULE_FILTER_NOT]))
+
+    predicates = []
+
+    for field in rule_filter:
+        values = rule_filter[field]
+
+        if field == RULE_FIELD_ENTITY_ID:
+            patterns = [
+                re.compile(f"^{fnmatch.translate(pattern)}") for pattern in values
+            ]
+
+            predicates.append(PatternPredicate(patterns))
+
+        elif field == RULE_FIELD_ENTITY_ID_REGEX:
+            patterns = [re.compile(pattern) for pattern in values]
+
+            predicates.append(PatternPredicate(patterns))
+
+        elif field in [RULE_FIELD_DISABLED, RULE_FIELD_HIDDEN]:
+            predicates.append(FieldPredicate(field, [values]))
+
+        else:
+            predicates.append(FieldPredicate(field, values))
+
+    result = predicates[0] if len(predicates) == 1 else AllPredicate(predicates)
+
+    return result
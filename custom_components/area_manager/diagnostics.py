@@ -9,7 +9,7 @@ from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import device_registry as dr, entity_registry as er
 from homeassistant.helpers.device_registry import DeviceEntry
 
-from .common.consts import DOMAIN
+from .common.consts import ATTR_ITEMS, DOMAIN, QUERY_ACTIVITY
 from .managers.ha_coordinator import HACoordinator
 
 _LOGGER = logging.getLogger(__name__)
@@ -50,7 +50,16 @@ def _async_get_diagnostics(
     data = {
         "areas": coordinator.areas,
         "entities": coordinator.entities,
+        "versions": {
+            "data": coordinator.version,
+            "areas": coordinator.areas_version,
+            "entities": coordinator.entities_version,
+        },
         "config": config_data,
+        "activity": {
+            "usage": coordinator.activity_history.get_usage(),
+            "transitions": coordinator.query(QUERY_ACTIVITY, {}).get(ATTR_ITEMS),
+        },
         "disabled_by": entry.disabled_by,
         "disabled_polling": entry.pref_disable_polling,
     }
@@ -6,19 +6,21 @@ from __future__ import annotations
 import logging
 from typing import Any
 
-from homeassistant.components.light import LightEntity
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import (
-    ATTR_NAME,
-    ATTR_STATE,
-    STATE_ON,
-    STATE_UNAVAILABLE,
-    Platform,
+from homeassistant.components.light import (
+    ATTR_BRIGHTNESS,
+    ATTR_COLOR_MODE,
+    ATTR_COLOR_TEMP_KELVIN,
+    ATTR_SUPPORTED_COLOR_MODES,
+    ColorMode,
+    LightEntity,
+    LightEntityFeature,
+    filter_supported_color_modes,
 )
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import STATE_OFF, STATE_ON, Platform
+from homeassistant.core import HomeAssistant
 
-from .common.base_entity import IntegrationBaseEntity, async_setup_base_entry
-from .common.consts import ALLOWED_STATE_TRANSITIONS, ATTR_ATTRIBUTES, DOMAIN
+from .common.base_entity import IntegrationAggregateEntity, async_setup_base_entry
 from .common.entity_descriptions import HALightEntityDescription
 from .managers.ha_coordinator import HACoordinator
 
@@ -39,7 +41,7 @@ async def async_setup_entry(
     )
 
 
-class HALightEntity(IntegrationBaseEntity, LightEntity):
+class HALightEntity(IntegrationAggregateEntity, LightEntity):
     """Representation of a light."""
 
     def __init__(
@@ -52,53 +54,34 @@ class HALightEntity(IntegrationBaseEntity, LightEntity):
         super().__init__(hass, entity_description, coordinator, area_id)
 
         self._attr_device_class = entity_description.device_class
+        self._attr_supported_features = LightEntityFeature.TRANSITION
+        self._attr_supported_color_modes = {ColorMode.ONOFF}
 
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        attributes = {"generated_by": DOMAIN}
-
-        entities = self.coordinator.get_related_entities(
-            self.area_id, self.entity_description
-        )
-
-        state = STATE_UNAVAILABLE if len(entities) == 0 else STATE_ON
-        entity_attributes = None
-
-        for entity in entities:
-            entity_state = entity[ATTR_STATE]
-            entity_name = entity[ATTR_NAME]
-
-            attributes[entity_name] = entity_state.state
+    def _set_state(self, state: Any, details: dict[str, Any]):
+        self._attr_is_on = state
+        self._attr_brightness = details.pop(ATTR_BRIGHTNESS, None)
+        self._attr_color_temp_kelvin = details.pop(ATTR_COLOR_TEMP_KELVIN, None)
 
-            state = self.get_light_state(state, entity_state.state)
+        color_mode = details.pop(ATTR_COLOR_MODE, None)
+        supported_color_modes = details.pop(ATTR_SUPPORTED_COLOR_MODES, [])
 
-            if entity_attributes is None:
-                entity_attributes = entity.get(ATTR_ATTRIBUTES)
+        if len(supported_color_modes) == 0:
+            supported_color_modes = [ColorMode.ONOFF]
 
-        if entity_attributes is not None:
-            attributes.update(entity_attributes)
+        supported_color_modes = filter_supported_color_modes(supported_color_modes)
 
-        self._attr_is_on = None if state == STATE_UNAVAILABLE else state
-        self._attr_extra_state_attributes = attributes
+        if color_mode not in supported_color_modes:
+            color_mode = sorted(supported_color_modes)[0]
 
-        self.async_write_ha_state()
-
-    @staticmethod
-    def get_light_state(current: str, state: str):
-        allowed_state_transitions = ALLOWED_STATE_TRANSITIONS.get(current, [])
-
-        if len(allowed_state_transitions) > 0 and state in allowed_state_transitions:
-            current = state
-
-        return current
+        self._attr_supported_color_modes = supported_color_modes
+        self._attr_color_mode = color_mode
 
     async def async_turn_on(self, **kwargs: Any) -> None:
-        value = kwargs.get(ATTR_STATE)
-
-        await self.coordinator.set_state(self.area_id, value, self.entity_description)
+        await self.coordinator.set_state(
+            self.area_id, STATE_ON, self.entity_description, kwargs
+        )
 
     async def async_turn_off(self, **kwargs: Any) -> None:
-        value = kwargs.get(ATTR_STATE)
-
-        await self.coordinator.set_state(self.area_id, value, self.entity_description)
+        await self.coordinator.set_state(
+            self.area_id, STATE_OFF, self.entity_description, kwargs
+        )
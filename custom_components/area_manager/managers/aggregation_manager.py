@@ -0,0 +1,884 @@
+from abc import ABC, abstractmethod
+import asyncio
+from collections.abc import Callable
+from datetime import datetime, timedelta
+import logging
+from typing import Any
+
+from homeassistant.components.light import (
+    ATTR_BRIGHTNESS,
+    ATTR_COLOR_MODE,
+    ATTR_COLOR_TEMP_KELVIN,
+    ATTR_SUPPORTED_COLOR_MODES,
+)
+from homeassistant.components.sensor import SensorDeviceClass
+from homeassistant.const import (
+    ATTR_AREA_ID,
+    ATTR_STATE,
+    ATTR_UNIT_OF_MEASUREMENT,
+    STATE_ON,
+    STATE_UNAVAILABLE,
+    STATE_UNKNOWN,
+    Platform,
+    UnitOfEnergy,
+    UnitOfPower,
+)
+from homeassistant.core import HomeAssistant, State, callback
+from homeassistant.util import dt as dt_util
+from homeassistant.util.unit_conversion import (
+    BaseUnitConverter,
+    EnergyConverter,
+    PowerConverter,
+)
+
+from ..common.area_rollup import AreaRollup
+from ..common.consts import (
+    AGGREGATION_AVERAGE,
+    AGGREGATION_OCCUPANCY,
+    AGGREGATION_SUM,
+    ATTR_ACTIVE_MEMBERS,
+    ATTR_LAST_ACTIVITY,
+    ATTR_MEMBERS,
+    ATTR_OCCUPIED_UNTIL,
+    ATTR_RULE,
+    DEFAULT_BATCH_WINDOW,
+    DEFAULT_OCCUPANCY_HOLD_TIME,
+    EVENT_AGGREGATES_CHANGED,
+    EVENT_DATA_CHANGES,
+    EVENT_DATA_NEW,
+    EVENT_DATA_OLD,
+    SUM_PRECISION,
+)
+from ..common.entity_descriptions import BaseEntityDescription
+from .hold_timer_scheduler import HoldTimerScheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class BaseAggregator(ABC):
+    """Aggregate of a rule per area, updated by the delta of a single member.
+
+    The delta is rolled up from the area of the member to the rollup areas,
+    ancestors of the area for nested rules and area groups including the area.
+    """
+
+    watched_attributes: frozenset[str] = frozenset()
+
+    def __init__(self, rule_key: str, include_nested: bool):
+        self.rule_key = rule_key
+
+        self.include_nested = include_nested
+
+    @abstractmethod
+    def set_member_state(
+        self, entity_id: str, area_id: str, state: State | None, rollup_areas: list[str]
+    ) -> list[str]:
+        """Apply the state of the member, returns the touched areas."""
+
+    @abstractmethod
+    def get_state(self, area_id: str, now: datetime) -> dict[str, Any]:
+        """State and details of the aggregate of the area."""
+
+    def get_deadline(self, area_id: str) -> datetime | None:
+        return None
+
+
+class AnyAggregator(BaseAggregator):
+    """On while any of the members is on, unavailable when none is available."""
+
+    def __init__(self, rule_key: str, include_nested: bool):
+        super().__init__(rule_key, include_nested)
+
+        self._members = AreaRollup()
+        self._available = AreaRollup()
+        self._active = AreaRollup()
+        self._member_flags: dict[str, tuple[bool, bool]] = {}
+
+    def set_member_state(
+        self, entity_id: str, area_id: str, state: State | None, rollup_areas: list[str]
+    ) -> list[str]:
+        flags = None
+
+        if state is not None:
+            is_available = state.state not in [STATE_UNAVAILABLE, STATE_UNKNOWN]
+            is_active = state.state == STATE_ON
+
+            flags = (is_available, is_active)
+
+        previous_flags = self._member_flags.pop(entity_id, None)
+
+        if flags is not None:
+            self._member_flags[entity_id] = flags
+
+        if flags == previous_flags:
+            return []
+
+        is_member, is_available, is_active = self._get_counters(flags)
+        was_member, was_available, was_active = self._get_counters(previous_flags)
+
+        self._members.apply(area_id, is_member - was_member, rollup_areas)
+        self._available.apply(area_id, is_available - was_available, rollup_areas)
+        self._active.apply(area_id, is_active - was_active, rollup_areas)
+
+        return [area_id, *rollup_areas]
+
+    def get_state(self, area_id: str, now: datetime) -> dict[str, Any]:
+        members = int(self._members.get(area_id))
+        available = int(self._available.get(area_id))
+        active = int(self._active.get(area_id))
+
+        state = None
+
+        if active > 0:
+            state = True
+
+        elif available > 0:
+            state = False
+
+        result = {
+            ATTR_STATE: state,
+            ATTR_MEMBERS: members,
+            ATTR_ACTIVE_MEMBERS: active,
+        }
+
+        return result
+
+    @staticmethod
+    def _get_counters(flags: tuple[bool, bool] | None) -> tuple[int, int, int]:
+        if flags is None:
+            return 0, 0, 0
+
+        is_available, is_active = flags
+
+        return 1, int(is_available), int(is_active)
+
+
+class LightAggregator(AnyAggregator):
+    """Light group, mean brightness and color temperature of the lights on."""
+
+    watched_attributes = frozenset(
+        {
+            ATTR_BRIGHTNESS,
+            ATTR_COLOR_MODE,
+            ATTR_COLOR_TEMP_KELVIN,
+            ATTR_SUPPORTED_COLOR_MODES,
+        }
+    )
+
+    def __init__(self, rule_key: str, include_nested: bool):
+        super().__init__(rule_key, include_nested)
+
+        self._brightness = AreaRollup()
+        self._brightness_members = AreaRollup()
+        self._color_temp = AreaRollup()
+        self._color_temp_members = AreaRollup()
+        self._color_modes: dict[str, AreaRollup] = {}
+        self._supported_color_modes: dict[str, AreaRollup] = {}
+        self._member_values: dict[str, tuple] = {}
+
+    def set_member_state(
+        self, entity_id: str, area_id: str, state: State | None, rollup_areas: list[str]
+    ) -> list[str]:
+        touched_areas = super().set_member_state(
+            entity_id, area_id, state, rollup_areas
+        )
+
+        values = self._get_values(state)
+        previous_values = self._member_values.pop(entity_id, None)
+
+        if values is not None:
+            self._member_values[entity_id] = values
+
+        if values == previous_values:
+            return touched_areas
+
+        self._apply(area_id, previous_values, -1, rollup_areas)
+        self._apply(area_id, values, 1, rollup_areas)
+
+        return [area_id, *rollup_areas]
+
+    def get_state(self, area_id: str, now: datetime) -> dict[str, Any]:
+        result = super().get_state(area_id, now)
+
+        brightness_members = self._brightness_members.get(area_id)
+        color_temp_members = self._color_temp_members.get(area_id)
+
+        color_modes = {
+            color_mode: self._color_modes[color_mode].get(area_id)
+            for color_mode in self._color_modes
+            if self._color_modes[color_mode].get(area_id) > 0
+        }
+
+        result[ATTR_BRIGHTNESS] = (
+            None
+            if brightness_members == 0
+            else round(self._brightness.get(area_id) / brightness_members)
+        )
+        result[ATTR_COLOR_TEMP_KELVIN] = (
+            None
+            if color_temp_members == 0
+            else round(self._color_temp.get(area_id) / color_temp_members)
+        )
+        result[ATTR_COLOR_MODE] = (
+            None if len(color_modes) == 0 else max(color_modes, key=color_modes.get)
+        )
+        result[ATTR_SUPPORTED_COLOR_MODES] = sorted(
+            color_mode
+            for color_mode in self._supported_color_modes
+            if self._supported_color_modes[color_mode].get(area_id) > 0
+        )
+
+        return result
+
+    def _apply(
+        self, area_id: str, values: tuple | None, sign: int, rollup_areas: list[str]
+    ):
+        if values is None:
+            return
+
+        brightness, color_temp, color_mode, supported_color_modes = values
+
+        if brightness is not None:
+            self._brightness.apply(area_id, sign * brightness, rollup_areas)
+            self._brightness_members.apply(area_id, sign, rollup_areas)
+
+        if color_temp is not None:
+            self._color_temp.apply(area_id, sign * color_temp, rollup_areas)
+            self._color_temp_members.apply(area_id, sign, rollup_areas)
+
+        if color_mode is not None:
+            color_mode_rollup = self._color_modes.setdefault(color_mode, AreaRollup())
+            color_mode_rollup.apply(area_id, sign, rollup_areas)
+
+        for supported_color_mode in supported_color_modes:
+            supported_color_mode_rollup = self._supported_color_modes.setdefault(
+                supported_color_mode, AreaRollup()
+            )
+            supported_color_mode_rollup.apply(area_id, sign, rollup_areas)
+
+    @staticmethod
+    def _get_values(state: State | None) -> tuple | None:
+        if state is None:
+            return None
+
+        attributes = state.attributes
+        supported_color_modes = tuple(
+            sorted(attributes.get(ATTR_SUPPORTED_COLOR_MODES) or [])
+        )
+
+        if state.state != STATE_ON:
+            return None, None, None, supported_color_modes
+
+        result = (
+            attributes.get(ATTR_BRIGHTNESS),
+            attributes.get(ATTR_COLOR_TEMP_KELVIN),
+            attributes.get(ATTR_COLOR_MODE),
+            supported_color_modes,
+        )
+
+        return result
+
+
+class FirstValueAggregator(BaseAggregator):
+    """State of the first available member per area, as reported by the member."""
+
+    def __init__(self, rule_key: str, include_nested: bool):
+        super().__init__(rule_key, include_nested)
+
+        self._values: dict[str, dict[str, str]] = {}
+
+    def set_member_state(
+        self, entity_id: str, area_id: str, state: State | None, rollup_areas: list[str]
+    ) -> list[str]:
+        touched_areas = [area_id, *rollup_areas]
+
+        for touched_area_id in touched_areas:
+            values = self._values.setdefault(touched_area_id, {})
+
+            if state is None:
+                values.pop(entity_id, None)
+
+            else:
+                values[entity_id] = state.state
+
+        return touched_areas
+
+    def get_state(self, area_id: str, now: datetime) -> dict[str, Any]:
+        values = self._values.get(area_id, {})
+
+        result = {
+            ATTR_STATE: next(iter(values.values()), None),
+            ATTR_MEMBERS: len(values),
+        }
+
+        return result
+
+
+class AverageAggregator(BaseAggregator):
+    """Average of numeric members per area, otherwise the latest member value."""
+
+    def __init__(self, rule_key: str, include_nested: bool):
+        super().__init__(rule_key, include_nested)
+
+        self._total = AreaRollup()
+        self._members = AreaRollup()
+        self._member_values: dict[str, float] = {}
+        self._latest_value: dict[str, str] = {}
+
+    def set_member_state(
+        self, entity_id: str, area_id: str, state: State | None, rollup_areas: list[str]
+    ) -> list[str]:
+        touched_areas = [area_id, *rollup_areas]
+
+        value = None
+        previous_value = self._member_values.pop(entity_id, None)
+
+        if state is not None and state.state not in [STATE_UNAVAILABLE, STATE_UNKNOWN]:
+            try:
+                value = float(state.state)
+
+            except ValueError:
+                for touched_area_id in touched_areas:
+                    self._latest_value[touched_area_id] = state.state
+
+        if value is not None:
+            self._member_values[entity_id] = value
+
+        value_delta = (value or 0) - (previous_value or 0)
+        members_delta = int(value is not None) - int(previous_value is not None)
+
+        self._members.apply(area_id, members_delta, rollup_areas)
+        self._total.apply(area_id, value_delta, rollup_areas)
+
+        return touched_areas
+
+    def get_state(self, area_id: str, now: datetime) -> dict[str, Any]:
+        members = int(self._members.get(area_id))
+
+        if members > 0:
+            state = round(self._total.get(area_id) / members, SUM_PRECISION)
+
+        else:
+            state = self._latest_value.get(area_id)
+
+        result = {
+            ATTR_STATE: state,
+            ATTR_MEMBERS: members,
+        }
+
+        return result
+
+
+class OccupancyAggregator(BaseAggregator):
+    """Occupancy per area, held for a period after the last member activity."""
+
+    def __init__(self, rule_key: str, hold_time: timedelta, include_nested: bool):
+        super().__init__(rule_key, include_nested)
+
+        self._hold_time = hold_time
+
+        self._active = AreaRollup()
+        self._active_members: set[str] = set()
+        self._last_activity: dict[str, datetime] = {}
+
+    def set_member_state(
+        self, entity_id: str, area_id: str, state: State | None, rollup_areas: list[str]
+    ) -> list[str]:
+        touched_areas = [area_id, *rollup_areas]
+
+        is_active = state is not None and state.state == STATE_ON
+        was_active = entity_id in self._active_members
+
+        if is_active != was_active:
+            if is_active:
+                self._active_members.add(entity_id)
+
+            else:
+                self._active_members.discard(entity_id)
+
+            self._active.apply(area_id, 1 if is_active else -1, rollup_areas)
+
+        # Activity is a member turning on or its on period ending, an initial
+        # or recovered off state is not
+        if state is not None and (is_active or was_active):
+            last_activity = state.last_changed
+
+            for touched_area_id in touched_areas:
+                area_last_activity = self._last_activity.get(touched_area_id)
+
+                if area_last_activity is None or area_last_activity < last_activity:
+                    self._last_activity[touched_area_id] = last_activity
+
+        return touched_areas
+
+    def get_deadline(self, area_id: str) -> datetime | None:
+        last_activity = self._last_activity.get(area_id)
+
+        if last_activity is None or self._active.get(area_id) > 0:
+            return None
+
+        return last_activity + self._hold_time
+
+    def get_state(self, area_id: str, now: datetime) -> dict[str, Any]:
+        active_members = int(self._active.get(area_id))
+        last_activity = self._last_activity.get(area_id)
+        occupied_until = (
+            None if last_activity is None else last_activity + self._hold_time
+        )
+
+        is_occupied = active_members > 0 or (
+            occupied_until is not None and now < occupied_until
+        )
+
+        result = {
+            ATTR_STATE: is_occupied,
+            ATTR_ACTIVE_MEMBERS: active_members,
+            ATTR_LAST_ACTIVITY: None
+            if last_activity is None
+            else last_activity.isoformat(),
+            ATTR_OCCUPIED_UNTIL: None
+            if occupied_until is None
+            else occupied_until.isoformat(),
+        }
+
+        return result
+
+
+class SumAggregator(BaseAggregator):
+    """Running total per area of numeric members, converted to a single unit.
+
+    With keep_unavailable, members that become unavailable or unknown keep
+    their last value, so totals of meters (energy) do not decrease.
+    """
+
+    watched_attributes = frozenset({ATTR_UNIT_OF_MEASUREMENT})
+
+    def __init__(
+        self,
+        rule_key: str,
+        converter: type[BaseUnitConverter],
+        unit_of_measurement: str,
+        include_nested: bool,
+        keep_unavailable: bool = False,
+    ):
+        super().__init__(rule_key, include_nested)
+
+        self._converter = converter
+        self._unit_of_measurement = unit_of_measurement
+        self._keep_unavailable = keep_unavailable
+
+        self._total = AreaRollup()
+        self._members = AreaRollup()
+        self._member_values: dict[str, float] = {}
+
+    def set_member_state(
+        self, entity_id: str, area_id: str, state: State | None, rollup_areas: list[str]
+    ) -> list[str]:
+        value = self._get_value(state)
+        previous_value = self._member_values.pop(entity_id, None)
+
+        if (
+            value is None
+            and self._keep_unavailable
+            and state is not None
+            and state.state in [STATE_UNAVAILABLE, STATE_UNKNOWN]
+        ):
+            value = previous_value
+
+        if value is not None:
+            self._member_values[entity_id] = value
+
+        value_delta = (value or 0) - (previous_value or 0)
+        members_delta = int(value is not None) - int(previous_value is not None)
+
+        self._members.apply(area_id, members_delta, rollup_areas)
+        self._total.apply(area_id, value_delta, rollup_areas)
+
+        touched_areas = (
+            [] if value_delta == 0 and members_delta == 0 else [area_id, *rollup_areas]
+        )
+
+        return touched_areas
+
+    def get_state(self, area_id: str, now: datetime) -> dict[str, Any]:
+        members = int(self._members.get(area_id))
+        total = round(self._total.get(area_id), SUM_PRECISION)
+
+        result = {
+            ATTR_STATE: None if members == 0 else total,
+            ATTR_MEMBERS: members,
+        }
+
+        return result
+
+    def _get_value(self, state: State | None) -> float | None:
+        if state is None:
+            return None
+
+        unit_of_measurement = state.attributes.get(ATTR_UNIT_OF_MEASUREMENT)
+
+        if unit_of_measurement not in self._converter.VALID_UNITS:
+            return None
+
+        try:
+            value = float(state.state)
+
+        except ValueError:
+            return None
+
+        result = self._converter.convert(
+            value, unit_of_measurement, self._unit_of_measurement
+        )
+
+        return result
+
+
+class AggregationManager:
+    """Incremental aggregates of area entity rules, processed in micro-batches.
+
+    Member states are queued and applied once per batch window (next event
+    loop iteration by default), each touched aggregate is recalculated once
+    per batch and on_changed is called once per batch with the changed
+    aggregates only.
+
+    Delta listeners are notified once per processed batch with the full state
+    of every aggregate changed in the batch (value and counts), keyed by rule
+    and area, the deltas are empty when no aggregate changed.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        on_changed: Callable[[dict[tuple[str, str], dict[str, Any]]], None],
+        batch_window: float = DEFAULT_BATCH_WINDOW,
+        fire_events: bool = True,
+    ):
+        self._hass = hass
+        self._on_changed = on_changed
+        self._batch_window = batch_window
+        self._fire_events = fire_events
+
+        self._scheduler = HoldTimerScheduler(hass, self._handle_hold_expired)
+
+        self._aggregators: dict[str, BaseAggregator] = {}
+        self._member_rules: dict[str, list[tuple[str, str]]] = {}
+        self._member_watched_attributes: dict[str, frozenset[str]] = {}
+        self._get_rollup_areas: Callable[[str, bool], list[str]] | None = None
+
+        self._states: dict[tuple[str, str], dict[str, Any]] = {}
+        self._queued: dict[str, State | None] = {}
+        self._pending: set[tuple[str, str]] = set()
+        self._flush_handler: asyncio.Handle | None = None
+        self._batch_started_at: float | None = None
+
+        self._delta_listeners: list[
+            Callable[[dict[tuple[str, str], dict[str, Any]]], None]
+        ] = []
+
+    def load(
+        self,
+        rules: list[BaseEntityDescription],
+        memberships: dict[str, dict[str, list[str]]],
+        get_rollup_areas: Callable[[str, bool], list[str]],
+        area_ids: list[str],
+    ):
+        self._scheduler.clear()
+
+        self._aggregators = {}
+        self._member_rules = {}
+        self._member_watched_attributes = {}
+        self._get_rollup_areas = get_rollup_areas
+
+        for rule in rules:
+            aggregator = self._create_aggregator(rule)
+
+            self._aggregators[rule.key] = aggregator
+
+            rule_memberships = memberships.get(rule.key, {})
+
+            for area_id in rule_memberships:
+                for entity_id in rule_memberships[area_id]:
+                    member_rules = self._member_rules.setdefault(entity_id, [])
+                    member_rules.append((rule.key, area_id))
+
+        for entity_id in self._member_rules:
+            self._load_watched_attributes(entity_id)
+
+            self.update(entity_id, self._hass.states.get(entity_id))
+
+        now = dt_util.utcnow()
+
+        previous_states = self._states
+
+        self._queued = {}
+        self._pending = set()
+        self._states = {
+            (rule_key, area_id): self._aggregators[rule_key].get_state(area_id, now)
+            for rule_key in self._aggregators
+            for area_id in area_ids
+        }
+
+        deltas = {
+            state_key: self._states[state_key]
+            for state_key in self._states
+            if previous_states.get(state_key) != self._states[state_key]
+        }
+
+        if len(deltas) > 0:
+            self._notify_deltas(deltas)
+
+        _LOGGER.debug(
+            f"Loaded {len(self._aggregators)} aggregated rules, "
+            f"Members: {len(self._member_rules)}"
+        )
+
+    def terminate(self):
+        self._scheduler.clear()
+
+        if self._flush_handler is not None:
+            self._flush_handler.cancel()
+            self._flush_handler = None
+
+        self._queued = {}
+        self._pending = set()
+        self._delta_listeners = []
+
+    def subscribe_deltas(
+        self, listener: Callable[[dict[tuple[str, str], dict[str, Any]]], None]
+    ) -> Callable[[], None]:
+        self._delta_listeners.append(listener)
+
+        def remove_listener():
+            if listener in self._delta_listeners:
+                self._delta_listeners.remove(listener)
+
+        return remove_listener
+
+    def queue_update(self, entity_id: str, state: State | None) -> bool:
+        if entity_id not in self._member_rules:
+            return False
+
+        self._queued[entity_id] = state
+
+        self._schedule_flush()
+
+        return True
+
+    def update(self, entity_id: str, state: State | None) -> bool:
+        member_rules = self._member_rules.get(entity_id)
+
+        if member_rules is None:
+            return False
+
+        for rule_key, area_id in member_rules:
+            aggregator = self._aggregators[rule_key]
+            rollup_areas = self._get_rollup_areas(area_id, aggregator.include_nested)
+
+            touched_areas = aggregator.set_member_state(
+                entity_id, area_id, state, rollup_areas
+            )
+
+            self._schedule_hold_timers(aggregator, touched_areas)
+            self._set_pending(rule_key, touched_areas)
+
+        return True
+
+    def set_member_rules(self, entity_id: str, member_rules: list[tuple[str, str]]):
+        self.update(entity_id, None)
+
+        if len(member_rules) == 0:
+            self._member_rules.pop(entity_id, None)
+
+        else:
+            self._member_rules[entity_id] = member_rules
+
+            self.update(entity_id, self._hass.states.get(entity_id))
+
+        self._load_watched_attributes(entity_id)
+
+    def get_watched_attributes(self, entity_id: str) -> frozenset[str]:
+        result = self._member_watched_attributes.get(entity_id, frozenset())
+
+        return result
+
+    def get_aggregate(self, rule_key: str, area_id: str) -> dict[str, Any] | None:
+        aggregator = self._aggregators.get(rule_key)
+
+        if aggregator is None:
+            return None
+
+        state = self._states.get((rule_key, area_id))
+
+        if state is None:
+            state = aggregator.get_state(area_id, dt_util.utcnow())
+
+        result = dict(state)
+
+        return result
+
+    def get_aggregates(self) -> dict[tuple[str, str], dict[str, Any]]:
+        result = dict(self._states)
+
+        return result
+
+    def _load_watched_attributes(self, entity_id: str):
+        member_rules = self._member_rules.get(entity_id, [])
+
+        watched_attributes = frozenset().union(
+            *[
+                self._aggregators[rule_key].watched_attributes
+                for rule_key, _ in member_rules
+            ]
+        )
+
+        if len(watched_attributes) == 0:
+            self._member_watched_attributes.pop(entity_id, None)
+
+        else:
+            self._member_watched_attributes[entity_id] = watched_attributes
+
+    @staticmethod
+    def _create_aggregator(rule: BaseEntityDescription) -> BaseAggregator:
+        if rule.aggregation == AGGREGATION_OCCUPANCY:
+            hold_time = (
+                DEFAULT_OCCUPANCY_HOLD_TIME
+                if rule.hold_time is None
+                else timedelta(seconds=rule.hold_time)
+            )
+
+            return OccupancyAggregator(rule.key, hold_time, rule.include_nested)
+
+        if rule.aggregation == AGGREGATION_SUM:
+            if rule.device_class == SensorDeviceClass.ENERGY:
+                return SumAggregator(
+                    rule.key,
+                    EnergyConverter,
+                    UnitOfEnergy.KILO_WATT_HOUR,
+                    rule.include_nested,
+                    keep_unavailable=True,
+                )
+
+            return SumAggregator(
+                rule.key, PowerConverter, UnitOfPower.WATT, rule.include_nested
+            )
+
+        if rule.aggregation == AGGREGATION_AVERAGE:
+            return AverageAggregator(rule.key, rule.include_nested)
+
+        if rule.platform == Platform.SENSOR:
+            return FirstValueAggregator(rule.key, rule.include_nested)
+
+        if rule.platform == Platform.LIGHT:
+            return LightAggregator(rule.key, rule.include_nested)
+
+        return AnyAggregator(rule.key, rule.include_nested)
+
+    def _schedule_hold_timers(self, aggregator: BaseAggregator, area_ids: list[str]):
+        now = dt_util.utcnow()
+
+        for area_id in area_ids:
+            timer_key = (aggregator.rule_key, area_id)
+            deadline = aggregator.get_deadline(area_id)
+
+            if deadline is None or deadline <= now:
+                self._scheduler.cancel(timer_key)
+
+            else:
+                self._scheduler.schedule(timer_key, deadline)
+
+    def _set_pending(self, rule_key: str, area_ids: list[str]):
+        if len(area_ids) == 0:
+            return
+
+        for area_id in area_ids:
+            self._pending.add((rule_key, area_id))
+
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._flush_handler is not None:
+            return
+
+        loop = self._hass.loop
+
+        self._batch_started_at = loop.time()
+
+        if self._batch_window > 0:
+            self._flush_handler = loop.call_later(self._batch_window, self._flush)
+
+        else:
+            self._flush_handler = loop.call_soon(self._flush)
+
+    @callback
+    def _flush(self):
+        queued = self._queued
+        self._queued = {}
+
+        for entity_id in queued:
+            self.update(entity_id, queued[entity_id])
+
+        self._flush_handler = None
+
+        pending = self._pending
+        self._pending = set()
+
+        now = dt_util.utcnow()
+        changes = []
+        deltas = {}
+
+        for rule_key, area_id in pending:
+            aggregator = self._aggregators.get(rule_key)
+
+            if aggregator is None:
+                continue
+
+            state_key = (rule_key, area_id)
+            old_state = self._states.get(state_key, {})
+            new_state = aggregator.get_state(area_id, now)
+
+            if old_state == new_state:
+                continue
+
+            self._states[state_key] = new_state
+            deltas[state_key] = new_state
+
+            old_value = old_state.get(ATTR_STATE)
+            new_value = new_state.get(ATTR_STATE)
+
+            if old_value == new_value:
+                continue
+
+            changes.append(
+                {
+                    ATTR_AREA_ID: area_id,
+                    ATTR_RULE: rule_key,
+                    EVENT_DATA_OLD: old_value,
+                    EVENT_DATA_NEW: new_value,
+                }
+            )
+
+        latency = (self._hass.loop.time() - self._batch_started_at) * 1000
+
+        _LOGGER.debug(
+            f"Batch processed, Members: {len(queued)}, Aggregates: {len(pending)}, "
+            f"Changes: {len(changes)}, Latency: {latency:.3f}ms"
+        )
+
+        if self._fire_events and len(changes) > 0:
+            self._hass.bus.async_fire(
+                EVENT_AGGREGATES_CHANGED, {EVENT_DATA_CHANGES: changes}
+            )
+
+        self._notify_deltas(deltas)
+
+        if len(deltas) > 0:
+            self._on_changed(deltas)
+
+    def _notify_deltas(self, deltas: dict[tuple[str, str], dict[str, Any]]):
+        for listener in list(self._delta_listeners):
+            listener(deltas)
+
+    @callback
+    def _handle_hold_expired(self, timer_keys: list[tuple[str, str]]):
+        for rule_key, area_id in timer_keys:
+            self._set_pending(rule_key, [area_id])
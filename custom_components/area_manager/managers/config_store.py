@@ -0,0 +1,174 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.json import JSONEncoder
+from homeassistant.helpers.storage import STORAGE_DIR, Store
+
+from ..common.consts import (
+    ATTR_AGGREGATION,
+    ATTR_FILTER,
+    ATTR_HOLD_TIME,
+    CONFIG_STORAGE_MINOR_VERSION,
+    CONFIG_STORAGE_VERSION,
+    JOURNAL_KEY,
+    JOURNAL_SECTION,
+    JOURNAL_VALUE,
+    JOURNAL_VERSION,
+    STORAGE_DATA_AREA_ENTITIES,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def migrate_config(data: dict, minor_version: int) -> dict:
+    """Migrate configuration of an older minor version to the current one."""
+    if minor_version < 2:
+        area_entities = data.get(STORAGE_DATA_AREA_ENTITIES, {})
+
+        for entity_key in area_entities:
+            entity = area_entities[entity_key]
+
+            entity.setdefault(ATTR_AGGREGATION, None)
+            entity.setdefault(ATTR_HOLD_TIME, None)
+            entity.setdefault(ATTR_FILTER, None)
+
+    return data
+
+
+class ConfigStore(Store):
+    """Configuration store with versioned schema."""
+
+    def __init__(self, hass: HomeAssistant, file_name: str):
+        super().__init__(
+            hass,
+            CONFIG_STORAGE_VERSION,
+            file_name,
+            encoder=JSONEncoder,
+            minor_version=CONFIG_STORAGE_MINOR_VERSION,
+        )
+
+    async def _async_migrate_func(
+        self, old_major_version: int, old_minor_version: int, old_data: dict
+    ) -> dict:
+        _LOGGER.info(
+            f"Migrating configuration from version {old_major_version}.{old_minor_version} "
+            f"to {CONFIG_STORAGE_VERSION}.{CONFIG_STORAGE_MINOR_VERSION}"
+        )
+
+        result = migrate_config(old_data, old_minor_version)
+
+        return result
+
+
+class ConfigJournal:
+    """Append-only journal of configuration changes, one JSON record per line.
+
+    Each record holds a single key of a configuration section, a record
+    without value removes the key, records are replayed over the store.
+    """
+
+    def __init__(self, hass: HomeAssistant, file_name: str):
+        self._hass = hass
+        self._path = hass.config.path(STORAGE_DIR, file_name)
+        self._lock = asyncio.Lock()
+        self._records = 0
+
+    @property
+    def records(self) -> int:
+        return self._records
+
+    async def load(self) -> list[dict[str, Any]]:
+        async with self._lock:
+            records = await self._hass.async_add_executor_job(self._read, self._path)
+
+        self._records = len(records)
+
+        return records
+
+    async def append(self, data: dict, changes: list[tuple[str, str]]):
+        records = []
+
+        for section, key in changes:
+            section_data = data.get(section, {})
+
+            record = {
+                JOURNAL_VERSION: CONFIG_STORAGE_MINOR_VERSION,
+                JOURNAL_SECTION: section,
+                JOURNAL_KEY: key,
+            }
+
+            if key in section_data:
+                record[JOURNAL_VALUE] = section_data[key]
+
+            records.append(json.dumps(record, cls=JSONEncoder))
+
+        async with self._lock:
+            await self._hass.async_add_executor_job(self._write, self._path, records)
+
+        self._records += len(records)
+
+    async def clear(self):
+        async with self._lock:
+            await self._hass.async_add_executor_job(self._remove, self._path)
+
+        self._records = 0
+
+    @staticmethod
+    def replay(data: dict, records: list[dict[str, Any]]) -> dict:
+        for record in records:
+            section = record.get(JOURNAL_SECTION)
+            key = record.get(JOURNAL_KEY)
+
+            if JOURNAL_VALUE not in record:
+                data.get(section, {}).pop(key, None)
+                continue
+
+            record_data = migrate_config(
+                {section: {key: record[JOURNAL_VALUE]}},
+                record.get(JOURNAL_VERSION, CONFIG_STORAGE_MINOR_VERSION),
+            )
+
+            data.setdefault(section, {})[key] = record_data[section][key]
+
+        return data
+
+    @staticmethod
+    def _read(path: str) -> list[dict[str, Any]]:
+        records = []
+
+        if not os.path.exists(path):
+            return records
+
+        with open(path, encoding="utf-8") as file:
+            for line_number, line in enumerate(file, start=1):
+                if line.strip() == "":
+                    continue
+
+                try:
+                    records.append(json.loads(line))
+
+                except ValueError:
+                    _LOGGER.warning(
+                        f"Skipping invalid journal record, File: {path}, Line: {line_number}"
+                    )
+
+        return records
+
+    @staticmethod
+    def _write(path: str, records: list[str]):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "a", encoding="utf-8") as file:
+            for record in records:
+                file.write(f"{record}\n")
+
+            file.flush()
+
+    @staticmethod
+    def _remove(path: str):
+        if os.path.exists(path):
+            os.remove(path)
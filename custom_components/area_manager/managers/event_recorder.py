@@ -0,0 +1,199 @@
+import asyncio
+from collections.abc import Coroutine
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any
+
+from homeassistant.const import ATTR_ENTITY_ID, ATTR_STATE, EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.json import JSONEncoder
+from homeassistant.helpers.storage import STORAGE_DIR
+
+from ..common.consts import (
+    ATTR_ATTRIBUTES,
+    ATTR_DURATION,
+    ATTR_EVENTS,
+    ATTR_FILE_NAME,
+    DOMAIN,
+    MAX_RECORDING_EVENTS,
+    RECORDING_DATA,
+    RECORDING_DIRECTORY,
+    RECORDING_EVENT_TYPE,
+    RECORDING_FILE_SUFFIX,
+    RECORDING_FLUSH_SIZE,
+    RECORDING_TIME,
+)
+from ..common.exceptions import RecordingExistsError
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def get_recording_file_name(file_name: str) -> str:
+    if file_name.endswith(RECORDING_FILE_SUFFIX):
+        return file_name
+
+    result = f"{file_name}{RECORDING_FILE_SUFFIX}"
+
+    return result
+
+
+def get_recording_path(hass: HomeAssistant, file_name: str) -> str:
+    """Recordings are kept in the storage directory of the integration."""
+    result = hass.config.path(
+        STORAGE_DIR, DOMAIN, RECORDING_DIRECTORY, get_recording_file_name(file_name)
+    )
+
+    return result
+
+
+class EventRecorder:
+    """Records the state and registry events handled by the coordinator.
+
+    Records are appended to the file in chunks of RECORDING_FLUSH_SIZE events,
+    only the chunk being filled is kept in memory.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+
+        self._file_name: str | None = None
+        self._path: str | None = None
+        self._started_at: float | None = None
+        self._records: list[dict[str, Any]] = []
+        self._events = 0
+        self._is_created = False
+
+        self._write_lock = asyncio.Lock()
+
+    @property
+    def is_recording(self) -> bool:
+        return self._file_name is not None
+
+    async def start(self, file_name: str, overwrite: bool = False):
+        file_name = get_recording_file_name(file_name)
+        path = get_recording_path(self._hass, file_name)
+
+        is_existing = await self._hass.async_add_executor_job(
+            self._prepare_directory, path
+        )
+
+        if is_existing and not overwrite:
+            raise RecordingExistsError(file_name)
+
+        _LOGGER.info(f"Start recording events to {path}")
+
+        self._file_name = file_name
+        self._path = path
+        self._started_at = time.monotonic()
+        self._records = []
+        self._events = 0
+        self._is_created = False
+
+    async def stop(self) -> dict[str, Any]:
+        file_name = self._file_name
+        path = self._path
+        events = self._events
+        duration = (
+            0 if self._started_at is None else time.monotonic() - self._started_at
+        )
+
+        if file_name is None:
+            return {ATTR_FILE_NAME: None, ATTR_EVENTS: 0, ATTR_DURATION: 0}
+
+        flush = self._flush()
+
+        self._file_name = None
+        self._path = None
+        self._started_at = None
+
+        await flush
+
+        _LOGGER.info(f"Recorded {events} events to {path}")
+
+        result = {
+            ATTR_FILE_NAME: file_name,
+            ATTR_EVENTS: events,
+            ATTR_DURATION: round(duration, 3),
+        }
+
+        return result
+
+    @callback
+    def record(self, event: Event):
+        if self._file_name is None:
+            return
+
+        if self._events >= MAX_RECORDING_EVENTS:
+            return
+
+        data = event.data
+
+        if event.event_type == EVENT_STATE_CHANGED:
+            new_state = data.get("new_state")
+
+            data = {
+                ATTR_ENTITY_ID: data.get(ATTR_ENTITY_ID),
+                "new_state": None
+                if new_state is None
+                else {
+                    ATTR_STATE: new_state.state,
+                    ATTR_ATTRIBUTES: dict(new_state.attributes),
+                },
+            }
+
+        self._records.append(
+            {
+                RECORDING_TIME: round(time.monotonic() - self._started_at, 6),
+                RECORDING_EVENT_TYPE: event.event_type,
+                RECORDING_DATA: data,
+            }
+        )
+
+        self._events += 1
+
+        if len(self._records) >= RECORDING_FLUSH_SIZE:
+            self._hass.async_create_task(self._flush())
+
+    def _flush(self) -> Coroutine[Any, Any, None]:
+        """Hands over the buffered records, written in the order of the calls."""
+        path = self._path
+        records = self._records
+        mode = "a" if self._is_created else "w"
+
+        self._records = []
+        self._is_created = True
+
+        return self._write_records(path, records, mode)
+
+    async def _write_records(self, path: str, records: list[dict[str, Any]], mode: str):
+        async with self._write_lock:
+            try:
+                await self._hass.async_add_executor_job(
+                    self._write, path, records, mode
+                )
+
+            except Exception as ex:
+                exc_type, exc_obj, tb = sys.exc_info()
+                line_number = tb.tb_lineno
+
+                _LOGGER.error(
+                    f"Failed to write {len(records)} recorded events to {path}, "
+                    f"Error: {ex}, Line: {line_number}"
+                )
+
+    @staticmethod
+    def _prepare_directory(path: str) -> bool:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        result = os.path.exists(path)
+
+        return result
+
+    @staticmethod
+    def _write(path: str, records: list[dict[str, Any]], mode: str):
+        with open(path, mode, encoding="utf-8") as file:
+            for record in records:
+                file.write(f"{json.dumps(record, cls=JSONEncoder)}\n")
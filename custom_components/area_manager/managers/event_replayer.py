@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import math
+import time
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.const import ATTR_ENTITY_ID, ATTR_STATE, EVENT_STATE_CHANGED
+from homeassistant.core import HomeAssistant, State, callback
+from homeassistant.exceptions import HomeAssistantError
+
+from ..common.consts import (
+    ATTR_ATTRIBUTES,
+    ATTR_DURATION,
+    ATTR_EVENTS,
+    ATTR_LATENCY,
+    ATTR_LOOP_LAG,
+    ATTR_SKIPPED,
+    ATTR_THROUGHPUT,
+    RECORDING_DATA,
+    RECORDING_EVENT_TYPE,
+    RECORDING_TIME,
+    REPLAY_LOOP_LAG_INTERVAL,
+    REPLAY_PERCENTILES,
+)
+from .event_recorder import get_recording_path
+
+if TYPE_CHECKING:
+    from .aggregation_manager import AggregationManager
+    from .ha_coordinator import HACoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class EventReplayer:
+    """Replays recorded state changes and measures how the aggregation keeps up.
+
+    Recorded states are applied to an aggregation of the current rules and
+    memberships detached from HA, states, registries, entities and the event
+    bus are not touched, recorded registry events are skipped.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: HACoordinator):
+        self._hass = hass
+        self._coordinator = coordinator
+
+        self._pending: list[float] = []
+        self._latencies: list[float] = []
+        self._loop_lags: list[float] = []
+        self._drained = asyncio.Event()
+
+        self._probe_handler: asyncio.TimerHandle | None = None
+
+    async def replay(self, file_name: str, speed: float) -> dict[str, Any]:
+        path = get_recording_path(self._hass, file_name)
+
+        records = await self._hass.async_add_executor_job(self._read, path)
+
+        _LOGGER.info(f"Replaying {len(records)} events from {path}, Speed: {speed}")
+
+        self._pending = []
+        self._latencies = []
+        self._loop_lags = []
+        self._drained.clear()
+
+        aggregation_manager = self._coordinator.create_aggregation_manager(
+            lambda _deltas: None
+        )
+
+        remove_listener = aggregation_manager.subscribe_deltas(self._handle_deltas)
+
+        self._schedule_probe()
+
+        skipped = 0
+        started_at = time.monotonic()
+
+        try:
+            for record in records:
+                if speed > 0:
+                    delay = (
+                        started_at + record[RECORDING_TIME] / speed - time.monotonic()
+                    )
+
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+
+                else:
+                    await asyncio.sleep(0)
+
+                if not self._apply(aggregation_manager, record):
+                    skipped += 1
+
+            if len(self._pending) > 0:
+                await self._drained.wait()
+
+        finally:
+            remove_listener()
+            aggregation_manager.terminate()
+
+            if self._probe_handler is not None:
+                self._probe_handler.cancel()
+                self._probe_handler = None
+
+        duration = time.monotonic() - started_at
+
+        result = {
+            ATTR_EVENTS: len(records),
+            ATTR_SKIPPED: skipped,
+            ATTR_DURATION: round(duration, 3),
+            ATTR_THROUGHPUT: round(len(records) / duration, 1) if duration > 0 else 0,
+            ATTR_LOOP_LAG: self._get_percentiles(self._loop_lags),
+            ATTR_LATENCY: self._get_percentiles(self._latencies),
+        }
+
+        _LOGGER.info(f"Replay completed, Result: {result}")
+
+        return result
+
+    def _apply(
+        self, aggregation_manager: AggregationManager, record: dict[str, Any]
+    ) -> bool:
+        if record.get(RECORDING_EVENT_TYPE) != EVENT_STATE_CHANGED:
+            return False
+
+        data = record.get(RECORDING_DATA, {})
+        entity_id = data.get(ATTR_ENTITY_ID)
+        new_state = data.get("new_state")
+
+        try:
+            state = (
+                None
+                if new_state is None
+                else State(
+                    entity_id,
+                    new_state.get(ATTR_STATE),
+                    new_state.get(ATTR_ATTRIBUTES),
+                )
+            )
+
+        except HomeAssistantError as ex:
+            _LOGGER.debug(f"Skipping invalid state of {entity_id}, Error: {ex}")
+
+            return False
+
+        if aggregation_manager.queue_update(entity_id, state):
+            self._pending.append(time.monotonic())
+            self._drained.clear()
+
+        return True
+
+    @callback
+    def _handle_deltas(self, _deltas: dict[tuple[str, str], dict[str, Any]]):
+        """Every queued member change is processed by the notified batch."""
+        now = time.monotonic()
+
+        self._latencies.extend(now - queued_at for queued_at in self._pending)
+
+        self._pending = []
+        self._drained.set()
+
+    def _schedule_probe(self):
+        loop = self._hass.loop
+        expected_at = loop.time() + REPLAY_LOOP_LAG_INTERVAL
+
+        self._probe_handler = loop.call_at(expected_at, self._probe, expected_at)
+
+    def _probe(self, expected_at: float):
+        self._loop_lags.append(max(0.0, self._hass.loop.time() - expected_at))
+
+        self._schedule_probe()
+
+    @staticmethod
+    def _get_percentiles(values: list[float]) -> dict[str, float | None]:
+        sorted_values = sorted(values)
+
+        result = {}
+
+        for percentile in REPLAY_PERCENTILES:
+            if len(sorted_values) == 0:
+                result[f"p{percentile}"] = None
+                continue
+
+            index = max(0, math.ceil(percentile / 100 * len(sorted_values)) - 1)
+
+            result[f"p{percentile}"] = round(sorted_values[index] * 1000, 3)
+
+        result["max"] = (
+            None if len(sorted_values) == 0 else round(sorted_values[-1] * 1000, 3)
+        )
+
+        return result
+
+    @staticmethod
+    def _read(path: str) -> list[dict[str, Any]]:
+        with open(path, encoding="utf-8") as file:
+            records = [json.loads(line) for line in file if line.strip() != ""]
+
+        return records
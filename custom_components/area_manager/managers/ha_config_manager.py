@@ -1,9 +1,15 @@
-import json
+from collections.abc import Callable
 import logging
 from typing import Any
 
 from homeassistant.config_entries import STORAGE_VERSION, ConfigEntry
-from homeassistant.const import ATTR_DOMAIN, ATTR_NAME, CONF_NAME, Platform
+from homeassistant.const import (
+    ATTR_AREA_ID,
+    ATTR_DOMAIN,
+    ATTR_NAME,
+    CONF_NAME,
+    Platform,
+)
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import translation
 from homeassistant.helpers.entity import DeviceInfo
@@ -12,25 +18,42 @@ from homeassistant.helpers.storage import Store
 from homeassistant.util import slugify
 
 from ..common.consts import (
+    AGGREGATIONS,
+    AREA_GROUP_PREFIX,
+    ATTR_AGGREGATION,
     ATTR_ATTRIBUTES,
+    ATTR_FILTER,
+    ATTR_HOLD_TIME,
     ATTR_INCLUDE_NESTED,
     ATTR_PARENT,
+    CONFIG_JOURNAL_COMPACTION_THRESHOLD,
+    DEFAULT_ACTIVITY_HISTORY_SIZE,
     DEFAULT_ENTRY_ID,
     DOMAIN,
+    OPTION_INHERIT,
+    SETTING_ACTIVITY_HISTORY_SIZE,
+    SNAPSHOT_SAVE_DELAY,
     STORAGE_DATA_AREA_ATTRIBUTES,
     STORAGE_DATA_AREA_DETAILS,
     STORAGE_DATA_AREA_ENTITIES,
+    STORAGE_DATA_AREA_GROUPS,
     STORAGE_DATA_AREA_PARENTS,
+    STORAGE_DATA_FILE_JOURNAL,
+    STORAGE_DATA_FILE_SNAPSHOT,
+    STORAGE_DATA_SETTINGS,
 )
 from ..common.entity_descriptions import BaseEntityDescription
-from ..common.exceptions import SystemAttributeError
+from ..common.exceptions import SystemAttributeError, UnsupportedAggregationError
+from .config_store import ConfigJournal, ConfigStore
 
 _LOGGER = logging.getLogger(__name__)
 
 
 class HAConfigManager:
     _translations: dict | None
-    _store: Store | None
+    _store: ConfigStore | None
+    _journal: ConfigJournal | None
+    _snapshot_store: Store | None
 
     def __init__(self, hass: HomeAssistant | None, entry: ConfigEntry | None):
         self._hass = hass
@@ -40,6 +63,11 @@ class HAConfigManager:
         self._unique_id = None
         self._entry_id = DEFAULT_ENTRY_ID
         self._store = None
+        self._journal = None
+        self._snapshot_store = None
+        self._snapshot_data: Callable[[], dict] | None = None
+        self._area_details_index: dict[str, dict[Any, set[str]]] = {}
+        self._resolved_area_details: dict[str, dict[str, Any]] = {}
 
         if entry is not None:
             self._unique_id = self._entry.unique_id
@@ -47,7 +75,17 @@ class HAConfigManager:
 
             file_name = f"{DOMAIN}.config.json"
 
-            self._store = Store(hass, STORAGE_VERSION, file_name, encoder=JSONEncoder)
+            self._store = ConfigStore(hass, file_name)
+
+            journal_file_name = f"{DOMAIN}.{STORAGE_DATA_FILE_JOURNAL}.jsonl"
+
+            self._journal = ConfigJournal(hass, journal_file_name)
+
+            snapshot_file_name = f"{DOMAIN}.{STORAGE_DATA_FILE_SNAPSHOT}.json"
+
+            self._snapshot_store = Store(
+                hass, STORAGE_VERSION, snapshot_file_name, encoder=JSONEncoder
+            )
 
     @property
     def name(self):
@@ -85,6 +123,26 @@ class HAConfigManager:
 
         return result
 
+    @property
+    def area_groups(self) -> dict[str, dict[str, Any]]:
+        result = self._data.get(STORAGE_DATA_AREA_GROUPS, {})
+
+        return result
+
+    @property
+    def activity_history_size(self) -> int:
+        settings = self._data.get(STORAGE_DATA_SETTINGS, {})
+
+        result = settings.get(
+            SETTING_ACTIVITY_HISTORY_SIZE, DEFAULT_ACTIVITY_HISTORY_SIZE
+        )
+
+        return result
+
+    @property
+    def area_details_index(self) -> dict[str, dict[Any, set[str]]]:
+        return self._area_details_index
+
     async def initialize(self):
         if self._hass is None:
             self._translations = {}
@@ -137,7 +195,105 @@ class HAConfigManager:
             if key not in self._data:
                 self._data[key] = value
 
-        await self._save()
+        if self._journal is not None:
+            records = await self._journal.load()
+
+            if len(records) > 0:
+                _LOGGER.debug(f"Replaying {len(records)} configuration changes")
+
+                ConfigJournal.replay(self._data, records)
+
+                await self._compact()
+
+        self._load_area_details_index()
+
+    def _load_area_details_index(self):
+        self._area_details_index = {}
+        self._resolved_area_details = {}
+
+        self._reload_area_details(list(self.area_details.keys()))
+
+    def _reload_area_details(self, area_ids: list[str]):
+        for area_id in area_ids:
+            resolved_area_details = self._resolved_area_details.pop(area_id, {})
+
+            for config_key in resolved_area_details:
+                self._unindex_area_details(
+                    area_id, config_key, resolved_area_details[config_key]
+                )
+
+        for area_id in area_ids:
+            area_details = self.area_details.get(area_id, {})
+
+            for config_key in area_details:
+                value = self.get_area_details(area_id, config_key)
+
+                self._index_area_details(area_id, config_key, value)
+
+    def _get_area_subtree(self, area_id: str) -> list[str]:
+        area_parents = self.area_parents
+        nested_area_ids = {}
+
+        for nested_area_id in area_parents:
+            parent_area_id = area_parents.get(nested_area_id)
+
+            if parent_area_id is not None:
+                nested_area_ids.setdefault(parent_area_id, []).append(nested_area_id)
+
+        subtree = [area_id]
+        index = 0
+
+        while index < len(subtree):
+            for nested_area_id in nested_area_ids.get(subtree[index], []):
+                if nested_area_id not in subtree:
+                    subtree.append(nested_area_id)
+
+            index += 1
+
+        return subtree
+
+    def _resolve_area_details(self, area_id: str, config_key: str) -> Any:
+        visited_area_ids = [area_id]
+        lookup_area_id = area_id
+
+        while True:
+            area_details = self.area_details.get(lookup_area_id, {})
+            value = area_details.get(config_key)
+
+            if value != OPTION_INHERIT:
+                return value
+
+            parent_area_id = self.area_parents.get(lookup_area_id)
+
+            if parent_area_id is None or parent_area_id in visited_area_ids:
+                return None
+
+            resolved_area_details = self._resolved_area_details.get(parent_area_id, {})
+
+            if config_key in resolved_area_details:
+                return resolved_area_details[config_key]
+
+            visited_area_ids.append(parent_area_id)
+            lookup_area_id = parent_area_id
+
+    def _index_area_details(self, area_id: str, config_key: str, value: Any):
+        if value is None:
+            return
+
+        attribute_index = self._area_details_index.setdefault(config_key, {})
+        attribute_index.setdefault(value, set()).add(area_id)
+
+    def _unindex_area_details(self, area_id: str, config_key: str, value: Any):
+        attribute_index = self._area_details_index.get(config_key, {})
+        area_ids = attribute_index.get(value)
+
+        if area_ids is None:
+            return
+
+        area_ids.discard(area_id)
+
+        if len(area_ids) == 0:
+            attribute_index.pop(value)
 
     async def _load_config_from_file(self):
         if self._store is not None:
@@ -150,18 +306,55 @@ class HAConfigManager:
             STORAGE_DATA_AREA_ENTITIES: {},
             STORAGE_DATA_AREA_PARENTS: {},
             STORAGE_DATA_AREA_DETAILS: {},
+            STORAGE_DATA_AREA_GROUPS: {},
+            STORAGE_DATA_SETTINGS: {},
         }
 
         return data
 
-    async def _save(self):
+    async def _save(self, changes: list[tuple[str, str]]):
+        if self._store is None or len(changes) == 0:
+            return
+
+        await self._journal.append(self._data, changes)
+
+        if self._journal.records >= CONFIG_JOURNAL_COMPACTION_THRESHOLD:
+            await self._compact()
+
+    async def _compact(self):
         if self._store is None:
             return
 
-        _LOGGER.info(json.dumps(self._data, indent=4))
+        _LOGGER.debug(
+            f"Compacting configuration, Journal records: {self._journal.records}"
+        )
 
-        await self._store.async_load()
         await self._store.async_save(self._data)
+        await self._journal.clear()
+
+    async def load_snapshot(self) -> dict | None:
+        if self._snapshot_store is None:
+            return None
+
+        snapshot = await self._snapshot_store.async_load()
+
+        return snapshot
+
+    def save_snapshot(self, snapshot_data: Callable[[], dict]):
+        if self._snapshot_store is None:
+            return
+
+        self._snapshot_data = snapshot_data
+
+        self._snapshot_store.async_delay_save(snapshot_data, SNAPSHOT_SAVE_DELAY)
+
+    async def flush_snapshot(self):
+        if self._snapshot_store is None or self._snapshot_data is None:
+            return
+
+        await self._snapshot_store.async_save(self._snapshot_data())
+
+        self._snapshot_data = None
 
     def get_entity_name(
         self,
@@ -188,7 +381,9 @@ class HAConfigManager:
     async def set_area_parent(self, area_id, parent_area_id: str | None):
         self._data[STORAGE_DATA_AREA_PARENTS][area_id] = parent_area_id
 
-        await self._save()
+        self._reload_area_details(self._get_area_subtree(area_id))
+
+        await self._save([(STORAGE_DATA_AREA_PARENTS, area_id)])
 
     async def set_area_attribute(self, name: str, options: list[str | int | bool]):
         _LOGGER.debug(f"Set area attribute: {name}, Options: {options}")
@@ -199,7 +394,7 @@ class HAConfigManager:
 
         self._data[STORAGE_DATA_AREA_ATTRIBUTES][name] = options
 
-        await self._save()
+        await self._save([(STORAGE_DATA_AREA_ATTRIBUTES, name)])
 
     async def remove_area_attribute(self, name: str):
         _LOGGER.debug(f"Remove area attribute: {name}")
@@ -210,17 +405,46 @@ class HAConfigManager:
         if name in self.area_attributes:
             self._data[STORAGE_DATA_AREA_ATTRIBUTES].pop(name)
 
-            await self._save()
+            changes = [(STORAGE_DATA_AREA_ATTRIBUTES, name)]
+            subtree = []
+
+            for area_id in self.area_details:
+                area_details = self.area_details[area_id]
+
+                if name in area_details:
+                    area_details.pop(name)
+
+                    changes.append((STORAGE_DATA_AREA_DETAILS, area_id))
+
+                    for nested_area_id in self._get_area_subtree(area_id):
+                        if nested_area_id not in subtree:
+                            subtree.append(nested_area_id)
+
+            self._reload_area_details(subtree)
+
+            await self._save(changes)
 
     async def set_area_entity(
         self,
         name: str,
         domain: str,
         include_nested: bool,
-        attribute: str,
-        values: list[str],
+        attribute: str | None,
+        values: list[str] | None,
+        aggregation: str | None = None,
+        hold_time: int | None = None,
+        rule_filter: dict | None = None,
     ):
-        _LOGGER.debug(f"Set area entity: {name}, domain: {domain}, values: {values}")
+        _LOGGER.debug(
+            f"Set area entity: {name}, "
+            f"domain: {domain}, "
+            f"values: {values}, "
+            f"aggregation: {aggregation}, "
+            f"filter: {rule_filter}"
+        )
+
+        if aggregation is not None and aggregation not in AGGREGATIONS.get(domain, []):
+            raise UnsupportedAggregationError(domain, aggregation)
 
         entity_key = slugify(name)
 
@@ -228,11 +452,16 @@ class HAConfigManager:
 
         entity[ATTR_DOMAIN] = domain
         entity[ATTR_INCLUDE_NESTED] = include_nested
-        entity[ATTR_ATTRIBUTES][attribute] = values
+        entity[ATTR_AGGREGATION] = aggregation
+        entity[ATTR_HOLD_TIME] = hold_time
+        entity[ATTR_FILTER] = rule_filter
+
+        if attribute is not None:
+            entity[ATTR_ATTRIBUTES][attribute] = values
 
         self._data[STORAGE_DATA_AREA_ENTITIES][entity_key] = entity
 
-        await self._save()
+        await self._save([(STORAGE_DATA_AREA_ENTITIES, entity_key)])
 
     async def remove_area_entity(self, name: str):
         _LOGGER.debug(f"Remove area entity: {name}")
@@ -242,7 +471,7 @@ class HAConfigManager:
         if entity_key in self.area_entities:
             self._data[STORAGE_DATA_AREA_ENTITIES].pop(entity_key)
 
-            await self._save()
+            await self._save([(STORAGE_DATA_AREA_ENTITIES, entity_key)])
 
     async def set_area_details(self, area_id: str, value: Any, config_key: str):
         area_details = self.area_details.get(area_id)
@@ -254,13 +483,119 @@ class HAConfigManager:
 
         self._data[STORAGE_DATA_AREA_DETAILS][area_id] = area_details
 
-        await self._save()
+        self._reload_area_details(self._get_area_subtree(area_id))
+
+        await self._save([(STORAGE_DATA_AREA_DETAILS, area_id)])
+
+    async def remove_area(self, area_id: str):
+        _LOGGER.debug(f"Remove area: {area_id}")
+
+        area_parents = self._data[STORAGE_DATA_AREA_PARENTS]
+        subtree = self._get_area_subtree(area_id)
+
+        nested_area_ids = [
+            nested_area_id
+            for nested_area_id in area_parents
+            if area_parents.get(nested_area_id) == area_id
+        ]
+
+        changes = []
+
+        for nested_area_id in nested_area_ids:
+            area_parents[nested_area_id] = None
+
+            changes.append((STORAGE_DATA_AREA_PARENTS, nested_area_id))
+
+        if area_id in area_parents:
+            area_parents.pop(area_id)
+
+            changes.append((STORAGE_DATA_AREA_PARENTS, area_id))
+
+        if area_id in self.area_details:
+            self._data[STORAGE_DATA_AREA_DETAILS].pop(area_id)
+
+            changes.append((STORAGE_DATA_AREA_DETAILS, area_id))
+
+        for group_id in self.area_groups:
+            group_area_ids = self.area_groups[group_id].get(ATTR_AREA_ID, [])
+
+            if area_id in group_area_ids:
+                group_area_ids.remove(area_id)
 
-    def get_area_details(self, area_id: str, config_key: str) -> Any:
-        area_details = self.area_details.get(area_id, {})
-        area_config_details = area_details.get(config_key, {})
+                changes.append((STORAGE_DATA_AREA_GROUPS, group_id))
+
+        self._reload_area_details(subtree)
+
+        await self._save(changes)
+
+    async def set_area_group(self, name: str, area_ids: list[str]) -> str:
+        _LOGGER.debug(f"Set area group: {name}, Areas: {area_ids}")
+
+        group_id = self.get_area_group_id(name)
+
+        self._data[STORAGE_DATA_AREA_GROUPS][group_id] = {
+            ATTR_NAME: name,
+            ATTR_AREA_ID: list(area_ids),
+        }
+
+        await self._save([(STORAGE_DATA_AREA_GROUPS, group_id)])
+
+        return group_id
+
+    async def remove_area_group(self, name: str) -> str | None:
+        _LOGGER.debug(f"Remove area group: {name}")
+
+        group_id = self.get_area_group_id(name)
+
+        if group_id not in self.area_groups:
+            return None
+
+        self._data[STORAGE_DATA_AREA_GROUPS].pop(group_id)
+
+        await self._save([(STORAGE_DATA_AREA_GROUPS, group_id)])
+
+        return group_id
+
+    @staticmethod
+    def get_area_group_id(name: str) -> str:
+        result = slugify(f"{AREA_GROUP_PREFIX} {name}")
+
+        return result
+
+    async def set_activity_history_size(self, size: int):
+        _LOGGER.debug(f"Set activity history size: {size}")
+
+        self._data[STORAGE_DATA_SETTINGS][SETTING_ACTIVITY_HISTORY_SIZE] = size
+
+        await self._save([(STORAGE_DATA_SETTINGS, SETTING_ACTIVITY_HISTORY_SIZE)])
+
+    def get_area_ids_by_details(self, config_key: str, values: list[Any]) -> set[str]:
+        attribute_index = self._area_details_index.get(config_key, {})
+
+        result = set()
+
+        for value in values:
+            result.update(attribute_index.get(value, set()))
+
+        return result
+
+    def get_area_details(
+        self, area_id: str, config_key: str, inherit: bool = True
+    ) -> Any:
+        if not inherit:
+            area_details = self.area_details.get(area_id, {})
+            area_config_details = area_details.get(config_key)
+
+            return area_config_details
+
+        resolved_area_details = self._resolved_area_details.setdefault(area_id, {})
+
+        if config_key not in resolved_area_details:
+            resolved_area_details[config_key] = self._resolve_area_details(
+                area_id, config_key
+            )
 
-        return area_config_details
+        return resolved_area_details[config_key]
 
     @staticmethod
     def get_default_area_entity(name):
@@ -1,6 +1,9 @@
+import asyncio
+from collections.abc import Callable
 from datetime import timedelta
 import logging
 import sys
+import time
 from typing import Any
 
 import async_timeout
@@ -8,9 +11,12 @@ import async_timeout
 from homeassistant.components.homeassistant import SERVICE_RELOAD_CONFIG_ENTRY
 from homeassistant.const import (
     ATTR_AREA_ID,
+    ATTR_DEVICE_CLASS,
     ATTR_DOMAIN,
     ATTR_ENTITY_ID,
     ATTR_NAME,
+    ATTR_SERVICE,
+    ATTR_SERVICE_DATA,
     ATTR_STATE,
     SERVICE_TURN_OFF,
     SERVICE_TURN_ON,
@@ -18,14 +24,24 @@ from homeassistant.const import (
     EntityCategory,
     Platform,
 )
-from homeassistant.core import Event, HomeAssistant
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    State,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceNotFound
 from homeassistant.helpers.area_registry import (
     EVENT_AREA_REGISTRY_UPDATED,
-    AreaEntry,
     AreaRegistry,
     async_get as async_ar_get,
 )
 from homeassistant.helpers.device_registry import (
+    EVENT_DEVICE_REGISTRY_UPDATED,
     DeviceRegistry,
     async_get as async_dr_get,
 )
@@ -39,14 +55,39 @@ from homeassistant.helpers.entity_registry import (
 )
 from homeassistant.helpers.event import async_track_state_change_event
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util, slugify
 
+from ..common.activity_history import ActivityHistory
 from ..common.consts import (
+    AGGREGATION_DEVICE_CLASSES,
+    AGGREGATION_SUM,
+    ATTR_AGGREGATION,
+    ATTR_AREAS,
     ATTR_ATTRIBUTE,
     ATTR_ATTRIBUTES,
+    ATTR_DRY_RUN,
+    ATTR_FILE_NAME,
+    ATTR_FILTER,
+    ATTR_HOLD_TIME,
     ATTR_INCLUDE_NESTED,
+    ATTR_ITEMS,
+    ATTR_LAST_CHANGED,
+    ATTR_LIMIT,
     ATTR_NESTED,
+    ATTR_NEW_STATE,
+    ATTR_OFFSET,
+    ATTR_OLD_STATE,
+    ATTR_OVERWRITE,
     ATTR_PARENT,
+    ATTR_QUERY,
+    ATTR_RULE,
+    ATTR_RULES,
+    ATTR_SINCE,
+    ATTR_SIZE,
+    ATTR_SPEED,
+    ATTR_TOTAL,
     ATTR_VALUES,
+    CONTROL_BATCH_SIZE,
     DATA_AREAS_KEY,
     DATA_CONFIG,
     DATA_ENTITIES_KEY,
@@ -56,21 +97,65 @@ from ..common.consts import (
     ENTITY_CONFIG_ENTRY_ID,
     ENTITY_PLATFORMS,
     HA_NAME,
+    OPTION_INHERIT,
+    QUERY_ACTIVITY,
+    QUERY_AREAS,
+    QUERY_MEMBERS,
+    QUERY_RULES,
+    RULE_FILTER_DEVICE_FIELDS,
+    SERVICE_CONTROL,
+    SERVICE_QUERY,
     SERVICE_REMOVE_ATTRIBUTE,
     SERVICE_REMOVE_ENTITY,
+    SERVICE_REMOVE_GROUP,
+    SERVICE_REPLAY,
+    SERVICE_SCHEMA_CONTROL,
+    SERVICE_SCHEMA_QUERY,
     SERVICE_SCHEMA_REMOVE_AREA_X,
+    SERVICE_SCHEMA_REPLAY,
+    SERVICE_SCHEMA_SET_ACTIVITY_HISTORY,
     SERVICE_SCHEMA_SET_ATTRIBUTE,
     SERVICE_SCHEMA_SET_ENTITY,
+    SERVICE_SCHEMA_SET_GROUP,
+    SERVICE_SCHEMA_START_RECORDING,
+    SERVICE_SET_ACTIVITY_HISTORY,
     SERVICE_SET_ATTRIBUTE,
     SERVICE_SET_ENTITY,
+    SERVICE_SET_GROUP,
+    SERVICE_START_RECORDING,
+    SERVICE_STOP_RECORDING,
     SIGNAL_AREA_LOADED,
+    SIGNAL_AREA_RENAMED,
+    SIGNAL_INTEGRATION_LOADED,
+    SNAPSHOT_CONFIG_FINGERPRINT,
+    SNAPSHOT_DEVICE_ENTITIES,
+    SNAPSHOT_ENTITY_MEMBERSHIPS,
+    SNAPSHOT_FINGERPRINT,
+    SNAPSHOT_MEMBERSHIPS,
 )
 from ..common.entity_descriptions import (
     BaseEntityDescription,
     HASelectEntityDescription,
+    HASensorEntityDescription,
     get_entity_description,
 )
+from ..common.registry_build import (
+    RegistryBuild,
+    RegistrySnapshot,
+    build_registry,
+    get_fingerprint,
+    get_nested_areas,
+    get_registry_fingerprint,
+    get_registry_index_fields,
+)
+from ..common.registry_diff import RegistryDiff
+from ..common.registry_index import RegistryIndex
+from ..common.rule_predicate import RulePredicate, compile_rule_filter
+from .aggregation_manager import AggregationManager
+from .event_recorder import EventRecorder
+from .event_replayer import EventReplayer
 from .ha_config_manager import HAConfigManager
+from .template_manager import TemplateManager
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -88,9 +173,10 @@ class HACoordinator(DataUpdateCoordinator):
             update_method=self._async_update_data,
         )
 
-        self._track_state_handler = None
+        self._track_state_handlers: dict[str, Callable[[], None]] = {}
         self._track_areas_handler = None
         self._track_entities_handler = None
+        self._track_devices_handler = None
 
         self._config_manager = config_manager
 
@@ -100,11 +186,56 @@ class HACoordinator(DataUpdateCoordinator):
 
         self._data = {}
         self._dispatched_areas = []
+        self._version = 0
+
+        self._area_entities: dict[str, list[str]] = {}
+        self._entity_entries: dict[str, RegistryEntry] = {}
+        self._device_entities: dict[str, list[str]] = {}
+        self._device_entity_ids: dict[str, set[str]] = {}
+        self._registry_fingerprint: str | None = None
+        self._config_fingerprint: str | None = None
+
+        self._areas_version = 0
+        self._entities_version = 0
+
+        self._rules: dict[str, BaseEntityDescription] = {}
+        self._memberships: dict[str, dict[str, list[str]]] = {}
+        self._entity_memberships: dict[str, list[tuple[str, str]]] = {}
+        self._rule_predicates: dict[str, RulePredicate] = {}
+        self._groups: dict[str, dict[str, Any]] = {}
+        self._area_groups: dict[str, list[str]] = {}
+        self._membership_attributes: frozenset[str] = frozenset()
+        self._registry_index = RegistryIndex()
+
+        self._reload_lock = asyncio.Lock()
+        self._is_reload_pending = False
+
+        self._aggregate_listeners: dict[tuple[str, str], list[CALLBACK_TYPE]] = {}
+
+        self._aggregation_manager = AggregationManager(
+            hass, self._handle_aggregates_changed
+        )
+
+        self._template_manager = TemplateManager(hass, self)
+        self._event_recorder = EventRecorder(hass)
+        self._activity_history = ActivityHistory(config_manager.activity_history_size)
 
     @property
     def config_manager(self) -> HAConfigManager:
         return self._config_manager
 
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def areas_version(self) -> int:
+        return self._areas_version
+
+    @property
+    def entities_version(self) -> int:
+        return self._entities_version
+
     @property
     def areas(self) -> dict:
         return self._data.get(DATA_AREAS_KEY, {})
@@ -113,6 +244,14 @@ class HACoordinator(DataUpdateCoordinator):
     def entities(self) -> dict:
         return self._data.get(DATA_ENTITIES_KEY, {})
 
+    @property
+    def groups(self) -> dict[str, dict[str, Any]]:
+        return self._groups
+
+    @property
+    def activity_history(self) -> ActivityHistory:
+        return self._activity_history
+
     async def async_config_entry_first_refresh(self) -> None:
         await super().async_config_entry_first_refresh()
 
@@ -136,13 +275,40 @@ class HACoordinator(DataUpdateCoordinator):
             EVENT_ENTITY_REGISTRY_UPDATED, self._handle_area_or_entity_changed_event
         )
 
+        self._track_devices_handler = self.hass.bus.async_listen(
+            EVENT_DEVICE_REGISTRY_UPDATED, self._handle_device_changed_event
+        )
+
         self._register_services()
 
-        await self._reload_data()
+        async_dispatcher_send(
+            self.hass, SIGNAL_INTEGRATION_LOADED, self._config_manager.entry_id
+        )
+
+        is_restored = await self._restore_snapshot()
+
+        if is_restored:
+            await self._start_listen_entity_change()
+
+            self.config_entry.async_create_background_task(
+                self.hass, self._reconcile_snapshot(), f"{DOMAIN}_reconcile_snapshot"
+            )
+
+        else:
+            await self._reload_data()
+
+        self._template_manager.initialize()
 
     async def terminate(self):
-        if self._track_state_handler is not None:
-            self._track_state_handler()
+        await self._config_manager.flush_snapshot()
+
+        self._aggregation_manager.terminate()
+        self._template_manager.terminate()
+
+        for remove_listener in self._track_state_handlers.values():
+            remove_listener()
+
+        self._track_state_handlers = {}
 
         if self._track_areas_handler is not None:
             self._track_areas_handler()
@@ -150,6 +316,9 @@ class HACoordinator(DataUpdateCoordinator):
         if self._track_entities_handler is not None:
             self._track_entities_handler()
 
+        if self._track_devices_handler is not None:
+            self._track_devices_handler()
+
     @staticmethod
     def get_default_device_info() -> DeviceInfo:
         device_info = DeviceInfo(
@@ -159,7 +328,7 @@ class HACoordinator(DataUpdateCoordinator):
         return device_info
 
     def get_device_info(self, area_id: str) -> DeviceInfo:
-        area_details = self.areas.get(area_id)
+        area_details = self.areas.get(area_id, self._groups.get(area_id))
         area_name = area_details.get(ATTR_NAME)
 
         device_info = DeviceInfo(identifiers={(DOMAIN, area_id)}, name=area_name)
@@ -182,7 +351,50 @@ class HACoordinator(DataUpdateCoordinator):
 
         return area
 
-    def get_entity_descriptions(self, platform: Platform) -> list:
+    def get_entity_descriptions(
+        self, platform: Platform, area_id: str | None = None
+    ) -> list:
+        if area_id is None:
+            entity_descriptions = self._get_integration_entity_descriptions()
+
+        elif area_id in self._groups:
+            entity_descriptions = [
+                entity_description
+                for entity_description in self._get_all_entity_descriptions()
+                if entity_description.platform in ENTITY_PLATFORMS
+            ]
+
+        else:
+            entity_descriptions = self._get_all_entity_descriptions()
+
+        result = [
+            entity_description
+            for entity_description in entity_descriptions
+            if entity_description.platform == platform
+        ]
+
+        return result
+
+    def _get_integration_entity_descriptions(self) -> list:
+        entity_descriptions = []
+
+        for attribute_key in self._config_manager.area_attributes:
+            options = self._config_manager.area_attributes.get(attribute_key, [])
+
+            for option in options:
+                entity_description = HASensorEntityDescription(
+                    key=slugify(f"{attribute_key} {option}"),
+                    name=f"{attribute_key.capitalize()} {option}",
+                    config_key=attribute_key,
+                    attributes={attribute_key: [option]},
+                    state_class=None,
+                )
+
+                entity_descriptions.append(entity_description)
+
+        return entity_descriptions
+
+    def _get_all_entity_descriptions(self) -> list:
         parent_entity_description = HASelectEntityDescription(
             key=ATTR_PARENT,
             name=ATTR_PARENT,
@@ -202,7 +414,7 @@ class HACoordinator(DataUpdateCoordinator):
                 name=attribute_key.capitalize(),
                 config_key=attribute_key,
                 entity_category=EntityCategory.CONFIG,
-                options=options,
+                options=[*options, OPTION_INHERIT],
             )
 
             entity_descriptions.append(entity_description)
@@ -213,395 +425,1784 @@ class HACoordinator(DataUpdateCoordinator):
             domain = entity_details.get(ATTR_DOMAIN)
             attributes = entity_details.get(ATTR_ATTRIBUTES)
             include_nested = entity_details.get(ATTR_INCLUDE_NESTED, False)
+            aggregation = entity_details.get(ATTR_AGGREGATION)
+            hold_time = entity_details.get(ATTR_HOLD_TIME)
+            rule_filter = entity_details.get(ATTR_FILTER)
 
             entity_description = get_entity_description(
-                Platform(domain), name, include_nested, attributes
+                Platform(domain),
+                name,
+                include_nested,
+                attributes,
+                aggregation,
+                hold_time,
+                rule_filter,
+                aggregation == AGGREGATION_SUM,
             )
 
             entity_descriptions.append(entity_description)
 
-        result = [
-            entity_description
-            for entity_description in entity_descriptions
-            if entity_description.platform == platform
-        ]
-
-        return result
+        return entity_descriptions
 
     async def set_parent(self, area_id: str, value: Any) -> None:
-        await self._config_manager.set_area_parent(area_id, value)
+        async with self._reload_lock:
+            await self._config_manager.set_area_parent(area_id, value)
+
+            self._load_nested_areas()
+            self._load_memberships()
+
+            self._version += 1
+
+            self._save_snapshot()
 
-        await self.async_request_refresh()
+            self.async_update_listeners()
 
     def get_area_details(
         self, area_id: str, entity_description: BaseEntityDescription
     ) -> Any:
-        return self._config_manager.get_area_details(area_id, entity_description.key)
+        return self._config_manager.get_area_details(
+            area_id, entity_description.key, False
+        )
 
     async def set_area_details(
         self, area_id: str, value: Any, entity_description: BaseEntityDescription
     ) -> None:
-        await self._config_manager.set_area_details(
-            area_id, value, entity_description.key
-        )
+        async with self._reload_lock:
+            await self._config_manager.set_area_details(
+                area_id, value, entity_description.key
+            )
+
+            self._version += 1
 
-        await self.async_request_refresh()
+            self.async_update_listeners()
 
     async def set_state(
-        self, area_id: str, value: Any, entity_description: BaseEntityDescription
+        self,
+        area_id: str,
+        value: Any,
+        entity_description: BaseEntityDescription,
+        service_data: dict[str, Any] | None = None,
     ) -> None:
+        """Control all the members of the area with a single service call."""
         entities = self.get_related_entities(area_id, entity_description)
         entity_ids = [entity[ATTR_ENTITY_ID] for entity in entities]
-        service_data = {ATTR_ENTITY_ID: entity_ids}
         service_name = None
 
+        if len(entity_ids) == 0:
+            return
+
         if entity_description.platform in [Platform.SWITCH, Platform.LIGHT]:
             service_name = SERVICE_TURN_ON if value == STATE_ON else SERVICE_TURN_OFF
 
         if service_name is not None:
-            self.hass.services.call(
-                entity_description.platform, service_name, service_data
+            await self.hass.services.async_call(
+                entity_description.platform,
+                service_name,
+                {**(service_data or {}), ATTR_ENTITY_ID: entity_ids},
+                blocking=True,
+            )
+
+    async def control(
+        self, domain: str, service: str, filters: dict[str, Any], dry_run: bool
+    ) -> dict[str, Any]:
+        """Call a service on the members of the areas, resolved from the indexes.
+
+        Areas are expanded by groups, nested areas and area attributes, members
+        by domain, device class and rules, targets are called in batches.
+        """
+        if not self.hass.services.has_service(domain, service):
+            raise ServiceNotFound(domain, service)
+
+        area_ids = self._get_control_area_ids(filters)
+
+        members = self._query_members(area_ids, {**filters, ATTR_DOMAIN: [domain]})
+        entity_ids = [member[ATTR_ENTITY_ID] for member in members]
+
+        service_data = filters.get(ATTR_SERVICE_DATA, {})
+
+        _LOGGER.debug(
+            f"Control {domain}.{service}, Areas: {area_ids}, "
+            f"Targets: {len(entity_ids)}, Dry run: {dry_run}"
+        )
+
+        if not dry_run and len(entity_ids) > 0:
+            await asyncio.gather(
+                *[
+                    self.hass.services.async_call(
+                        domain,
+                        service,
+                        {
+                            **service_data,
+                            ATTR_ENTITY_ID: entity_ids[
+                                index : index + CONTROL_BATCH_SIZE
+                            ],
+                        },
+                        blocking=True,
+                    )
+                    for index in range(0, len(entity_ids), CONTROL_BATCH_SIZE)
+                ]
             )
 
+        result = {
+            ATTR_DOMAIN: domain,
+            ATTR_SERVICE: service,
+            ATTR_AREAS: area_ids,
+            ATTR_ENTITY_ID: entity_ids,
+            ATTR_DRY_RUN: dry_run,
+        }
+
+        return result
+
+    def _get_control_area_ids(self, filters: dict[str, Any]) -> list[str]:
+        requested_area_ids = []
+
+        for area_id in filters.get(ATTR_AREA_ID, []):
+            group = self._groups.get(area_id)
+
+            if group is None:
+                requested_area_ids.append(area_id)
+
+            else:
+                requested_area_ids.extend(group.get(ATTR_AREA_ID, []))
+
+        result = self._get_query_area_ids(
+            {**filters, ATTR_AREA_ID: list(dict.fromkeys(requested_area_ids))}
+        )
+
+        return result
+
     def get_related_entities(
         self, area_id: str, entity_description: BaseEntityDescription
     ) -> list[dict[str, Any]]:
         result = []
         area_lookup = [area_id]
 
-        if entity_description.include_nested:
-            area_details = self.areas.get(area_id, {})
-            nested_area = area_details.get(ATTR_NESTED, [])
-
-            area_lookup.extend(nested_area)
+        if area_id in self._groups:
+            area_lookup = self._groups[area_id].get(ATTR_AREA_ID, [])
 
-        for entity_id in self.entities:
-            entity_details = self.entities[entity_id]
-            entity_area_id = entity_details.get(ATTR_AREA_ID)
+        if entity_description.include_nested:
+            for lookup_area_id in list(area_lookup):
+                area_details = self.areas.get(lookup_area_id, {})
+                nested_area = area_details.get(ATTR_NESTED, [])
 
-            entity_attributes = entity_details.get(ATTR_ATTRIBUTES, {})
-            generated_by = entity_attributes.get("generated_by")
+                area_lookup.extend(
+                    nested_area_id
+                    for nested_area_id in nested_area
+                    if nested_area_id not in area_lookup
+                )
 
-            relevant_entity = generated_by != DOMAIN
-            relevant_domain = entity_id.startswith(f"{entity_description.platform}.")
-            relevant_area = entity_area_id in area_lookup
-            relevant_attributes = True
+        rule_memberships = self._memberships.get(entity_description.key, {})
 
-            if entity_description.attributes is not None:
-                for attribute_key in entity_description.attributes:
-                    attributes_values = entity_description.attributes.get(attribute_key)
-                    entity_attribute = entity_attributes.get(attribute_key)
-
-                    if entity_attribute not in attributes_values:
-                        relevant_attributes = False
-                        break
-
-            is_relevant = False not in [
-                relevant_entity,
-                relevant_area,
-                relevant_domain,
-                relevant_attributes,
-            ]
+        for lookup_area_id in area_lookup:
+            for entity_id in rule_memberships.get(lookup_area_id, []):
+                entity_details = self.entities.get(entity_id)
 
-            if is_relevant:
-                result.append(entity_details)
+                if entity_details is not None:
+                    result.append(entity_details)
 
         return result
 
-    def _register_services(self):
-        self.hass.services.async_register(
-            DOMAIN,
-            SERVICE_SET_ATTRIBUTE,
-            self._handle_service_set_attribute,
-            SERVICE_SCHEMA_SET_ATTRIBUTE,
-        )
-
-        self.hass.services.async_register(
-            DOMAIN,
-            SERVICE_REMOVE_ATTRIBUTE,
-            self._handle_service_remove_attribute,
-            SERVICE_SCHEMA_REMOVE_AREA_X,
-        )
+    def create_aggregation_manager(
+        self, on_changed: Callable[[dict[tuple[str, str], dict[str, Any]]], None]
+    ) -> AggregationManager:
+        """Aggregation of the current rules and memberships, detached from HA.
 
-        self.hass.services.async_register(
-            DOMAIN,
-            SERVICE_SET_ENTITY,
-            self._handle_service_set_entity,
-            SERVICE_SCHEMA_SET_ENTITY,
+        Changes are neither written to the entities nor fired on the event bus.
+        """
+        aggregation_manager = AggregationManager(
+            self.hass, on_changed, fire_events=False
         )
 
-        self.hass.services.async_register(
-            DOMAIN,
-            SERVICE_REMOVE_ENTITY,
-            self._handle_service_remove_entity,
-            SERVICE_SCHEMA_REMOVE_AREA_X,
+        aggregation_manager.load(
+            list(self._rules.values()),
+            self._memberships,
+            self.get_rollup_areas,
+            [*self.areas.keys(), *self._groups.keys()],
         )
 
-    def _handle_service_set_attribute(self, service_call):
-        self.hass.async_create_task(
-            self._async_handle_service_set_attribute(service_call)
-        )
+        return aggregation_manager
 
-    def _handle_service_remove_attribute(self, service_call):
-        self.hass.async_create_task(
-            self._async_handle_service_remove_attribute(service_call)
-        )
+    def get_area_entity_ids(self, area_id: str) -> list[str]:
+        result = self._area_entities.get(area_id, [])
 
-    def _handle_service_set_entity(self, service_call):
-        self.hass.async_create_task(self._async_handle_service_set_entity(service_call))
+        return result
 
-    def _handle_service_remove_entity(self, service_call):
-        self.hass.async_create_task(
-            self._async_handle_service_remove_entity(service_call)
+    def get_aggregate(
+        self, area_id: str, entity_description: BaseEntityDescription
+    ) -> dict[str, Any] | None:
+        result = self._aggregation_manager.get_aggregate(
+            entity_description.key, area_id
         )
 
-    async def _async_handle_service_set_attribute(self, service_call):
-        data = service_call.data
-        name = data.get(ATTR_NAME)
-        options = data.get(ATTR_VALUES)
-
-        await self._config_manager.set_area_attribute(name, options)
+        return result
 
-        await self._reload_integration()
+    @callback
+    def async_add_aggregate_listener(
+        self, area_id: str, rule_key: str, update_callback: CALLBACK_TYPE
+    ) -> CALLBACK_TYPE:
+        """Listen to the changes of a single aggregate of an area."""
+        state_key = (rule_key, area_id)
+        listeners = self._aggregate_listeners.setdefault(state_key, [])
 
-    async def _async_handle_service_remove_attribute(self, service_call):
-        data = service_call.data
-        name = data.get(ATTR_NAME)
+        listeners.append(update_callback)
 
-        await self._config_manager.remove_area_attribute(name)
+        @callback
+        def remove_listener():
+            if update_callback in listeners:
+                listeners.remove(update_callback)
 
-        await self._reload_integration()
+            if len(listeners) == 0:
+                self._aggregate_listeners.pop(state_key, None)
 
-    async def _async_handle_service_set_entity(self, service_call):
-        data = service_call.data
-        name = data.get(ATTR_NAME)
-        domain = data.get(ATTR_DOMAIN)
-        attribute = data.get(ATTR_ATTRIBUTE)
-        values = data.get(ATTR_VALUES)
-        include_nested = data.get(ATTR_INCLUDE_NESTED, False)
+        return remove_listener
 
-        await self._config_manager.set_area_entity(
-            name, domain, include_nested, attribute, values
-        )
+    @callback
+    def _handle_aggregates_changed(self, deltas: dict[tuple[str, str], dict[str, Any]]):
+        """Only the entities of the changed aggregates are updated."""
+        for state_key in deltas:
+            for update_callback in list(self._aggregate_listeners.get(state_key, [])):
+                update_callback()
 
-        await self._reload_integration()
+    def get_aggregates(self, filters: dict[str, Any]) -> list[dict[str, Any]]:
+        area_ids = self._get_subscription_area_ids(filters)
+        rule_keys = filters.get(ATTR_RULE)
 
-    async def _async_handle_service_remove_entity(self, service_call):
-        data = service_call.data
-        name = data.get(ATTR_NAME)
+        aggregates = self._aggregation_manager.get_aggregates()
 
-        await self._config_manager.remove_area_entity(name)
+        result = self._get_aggregate_items(aggregates, area_ids, rule_keys)
 
-        await self._reload_integration()
+        return result
 
-    async def _reload_integration(self):
-        data = {ENTITY_CONFIG_ENTRY_ID: self.config_entry.entry_id}
+    def subscribe_aggregates(
+        self,
+        filters: dict[str, Any],
+        listener: Callable[[list[dict[str, Any]]], None],
+    ) -> Callable[[], None]:
+        """Listen to the aggregates changed per batch, matching the filters.
 
-        await self.hass.services.async_call(HA_NAME, SERVICE_RELOAD_CONFIG_ENTRY, data)
+        Areas are resolved per batch, so areas loaded or nested later match.
+        """
+        rule_keys = filters.get(ATTR_RULE)
 
-    async def _handle_area_or_entity_changed_event(self, _event: Event):
-        await self._reload_data()
+        @callback
+        def _handle_deltas(deltas: dict[tuple[str, str], dict[str, Any]]):
+            area_ids = self._get_subscription_area_ids(filters)
+            items = self._get_aggregate_items(deltas, area_ids, rule_keys)
 
-    async def _reload_data(self):
-        self._load_areas()
-        self._load_entities()
+            if len(items) > 0:
+                listener(items)
 
-        await self._start_listen_entity_change()
+        result = self._aggregation_manager.subscribe_deltas(_handle_deltas)
 
-    def get_area_parent_id(self, area_id: str) -> str | None:
-        area_parent = self._config_manager.area_parents.get(area_id)
+        return result
 
-        return area_parent
+    def _get_subscription_area_ids(self, filters: dict[str, Any]) -> set[str] | None:
+        requested_area_ids = filters.get(ATTR_AREA_ID)
 
-    def _get_nested_area(self, area_id: str, nested_areas=None) -> list[str]:
-        if nested_areas is None:
-            nested_areas = []
+        if requested_area_ids is None:
+            return None
 
-        area_parents = self._config_manager.area_parents
+        group_ids = [
+            area_id for area_id in requested_area_ids if area_id in self._groups
+        ]
 
-        for area_config_id in area_parents:
-            area_parent = self.get_area_parent_id(area_config_id)
+        result = {*self._get_query_area_ids(filters), *group_ids}
 
-            if area_parent == area_id:
-                nested_areas.append(area_config_id)
+        return result
 
-                self._get_nested_area(area_config_id, nested_areas)
+    @staticmethod
+    def _get_aggregate_items(
+        aggregates: dict[tuple[str, str], dict[str, Any]],
+        area_ids: set[str] | None,
+        rule_keys: list[str] | None,
+    ) -> list[dict[str, Any]]:
+        items = []
 
-        return nested_areas
+        for rule_key, area_id in aggregates:
+            if area_ids is not None and area_id not in area_ids:
+                continue
 
-    def _load_areas(self):
-        try:
-            _LOGGER.debug("Start loading areas")
+            if rule_keys is not None and rule_key not in rule_keys:
+                continue
 
-            area_current_key = "|".join(self._ar.areas.keys())
-            area_previous_key = "|".join(self.areas.keys())
+            items.append(
+                {
+                    ATTR_AREA_ID: area_id,
+                    ATTR_RULE: rule_key,
+                    **aggregates[(rule_key, area_id)],
+                }
+            )
 
-            if area_current_key != area_previous_key:
-                self._data[DATA_AREAS_KEY] = {}
-                self._dispatched_areas = []
+        return items
 
-                for area in self._ar.areas.values():
-                    self._load_area(area)
+    def query(self, query: str, filters: dict[str, Any]) -> dict[str, Any]:
+        area_ids = self._get_query_area_ids(filters)
 
-                _LOGGER.debug(f"Loaded {len(self.areas.keys())} areas")
+        if query == QUERY_AREAS:
+            items = self._query_areas(area_ids)
 
-            else:
-                _LOGGER.debug("No changes for areas list")
+        elif query == QUERY_MEMBERS:
+            items = self._query_members(area_ids, filters)
 
-        except Exception as ex:
-            exc_type, exc_obj, tb = sys.exc_info()
-            line_number = tb.tb_lineno
+        elif query == QUERY_RULES:
+            items = self._query_rules(area_ids, filters)
 
-            _LOGGER.error(f"Failed to load areas, Error: {ex}, Line: {line_number}")
+        elif query == QUERY_ACTIVITY:
+            items = self._query_activity(area_ids, filters)
 
-    def _load_area(self, area: AreaEntry):
-        _LOGGER.debug(f"Loading are '{area.name}'")
+        else:
+            raise ValueError(f"Unsupported query '{query}'")
 
-        nested_area = self._get_nested_area(area.id)
+        offset = filters.get(ATTR_OFFSET, 0)
+        limit = filters.get(ATTR_LIMIT, len(items))
 
-        self._data[DATA_AREAS_KEY][area.id] = {
-            ATTR_NAME: area.name,
-            ATTR_AREA_ID: area.id,
-            ATTR_NESTED: nested_area,
+        result = {
+            ATTR_TOTAL: len(items),
+            ATTR_OFFSET: offset,
+            ATTR_LIMIT: limit,
+            ATTR_ITEMS: items[offset : offset + limit],
         }
 
-    def _load_entities(self):
-        try:
-            _LOGGER.debug("Start loading entities")
-
-            all_area_entities = {
-                area_id: self._get_relevant_entities(area_id) for area_id in self.areas
-            }
+        return result
 
-            entities = []
+    def _get_query_area_ids(self, filters: dict[str, Any]) -> list[str]:
+        requested_area_ids = filters.get(ATTR_AREA_ID)
+        attributes = filters.get(ATTR_ATTRIBUTES)
 
-            for area_id in all_area_entities:
-                area_entities = all_area_entities[area_id]
+        if requested_area_ids is None:
+            area_ids = list(self.areas.keys())
 
-                entities.extend(area_entities)
+        else:
+            area_ids = []
+            include_nested = filters.get(ATTR_INCLUDE_NESTED, False)
 
-            current_entities = [entity.entity_id for entity in entities]
+            for area_id in requested_area_ids:
+                area_details = self.areas.get(area_id)
 
-            current_key = "|".join(current_entities)
-            previous_key = "|".join(self.entities.keys())
+                if area_details is None:
+                    continue
 
-            if current_key != previous_key:
-                self._data[DATA_ENTITIES_KEY] = {}
+                area_ids.append(area_id)
 
-                for area_id in all_area_entities:
-                    area = self.areas.get(area_id)
-                    entities = all_area_entities[area_id]
+                if include_nested:
+                    area_ids.extend(area_details.get(ATTR_NESTED, []))
 
-                    for entity in entities:
-                        self._load_entity(entity, area)
+            area_ids = list(dict.fromkeys(area_ids))
 
-                _LOGGER.debug(f"Loaded {len(self.entities.keys())} entities")
+        if attributes is not None:
+            matching_area_ids = self.get_area_ids_by_attributes(attributes)
 
-            else:
-                _LOGGER.debug("No changes for entity list")
+            area_ids = [area_id for area_id in area_ids if area_id in matching_area_ids]
 
-        except Exception as ex:
-            exc_type, exc_obj, tb = sys.exc_info()
-            line_number = tb.tb_lineno
+        return area_ids
 
-            _LOGGER.error(f"Failed to load entities, Error: {ex}, Line: {line_number}")
+    def get_area_ids_by_attributes(self, attributes: dict[str, list[Any]]) -> set[str]:
+        result = set(self.areas.keys())
 
-    def _get_relevant_entities(self, look_for_area_id: str) -> list[RegistryEntry]:
-        result: list[RegistryEntry] = []
+        for attribute_key in attributes:
+            area_ids = self._config_manager.get_area_ids_by_details(
+                attribute_key, attributes[attribute_key]
+            )
 
-        try:
-            all_devices = self._dr.devices
+            result.intersection_update(area_ids)
 
-            for entity in self._er.entities.values():
-                area_id = entity.area_id
+        return result
 
-                if entity.area_id is None and entity.device_id is not None:
-                    device = all_devices.get(entity.device_id)
-                    area_id = device.area_id
+    def _query_areas(self, area_ids: list[str]) -> list[dict[str, Any]]:
+        items = []
 
-                if area_id == look_for_area_id and entity.domain in ENTITY_PLATFORMS:
-                    result.append(entity)
+        for area_id in area_ids:
+            area_details = self.areas.get(area_id)
 
-        except Exception as ex:
-            exc_type, exc_obj, tb = sys.exc_info()
-            line_number = tb.tb_lineno
+            attributes = {
+                attribute_key: self._config_manager.get_area_details(
+                    area_id, attribute_key
+                )
+                for attribute_key in self._config_manager.area_attributes
+            }
 
-            _LOGGER.error(
-                f"Failed to get relevant entities, Area: {look_for_area_id}, Error: {ex}, Line: {line_number}"
+            items.append(
+                {
+                    ATTR_AREA_ID: area_id,
+                    ATTR_NAME: area_details.get(ATTR_NAME),
+                    ATTR_PARENT: self.get_area_parent_id(area_id),
+                    ATTR_NESTED: area_details.get(ATTR_NESTED, []),
+                    ATTR_ATTRIBUTES: attributes,
+                }
             )
 
-        return result
+        return items
 
-    def _load_entity(self, entity: RegistryEntry, area: dict):
-        entity_data = entity.as_partial_dict
+    def _query_members(
+        self, area_ids: list[str], filters: dict[str, Any]
+    ) -> list[dict[str, Any]]:
+        domains = filters.get(ATTR_DOMAIN)
+        device_classes = filters.get(ATTR_DEVICE_CLASS)
+        rule_keys = filters.get(ATTR_RULE)
+
+        items = []
+
+        for area_id in area_ids:
+            for entity_id in self._area_entities.get(area_id, []):
+                entity_details = self.entities.get(entity_id)
+
+                if entity_details is None:
+                    continue
+
+                domain = entity_details.get(ATTR_DOMAIN)
+                entity_state = self.hass.states.get(entity_id)
+                device_class = (
+                    None
+                    if entity_state is None
+                    else entity_state.attributes.get(ATTR_DEVICE_CLASS)
+                )
+                entity_rule_keys = [
+                    rule_key
+                    for rule_key, _area_id in self._entity_memberships.get(
+                        entity_id, []
+                    )
+                ]
 
-        try:
-            entity_data[ATTR_AREA_ID] = area.get(ATTR_AREA_ID)
-            entity_data[ATTR_NAME] = area.get(ATTR_NAME)
+                if domains is not None and domain not in domains:
+                    continue
 
-            entity_data[ATTR_DOMAIN] = entity.domain
-            entity_data[ATTR_STATE] = self.hass.states.get(entity.entity_id)
+                if device_classes is not None and device_class not in device_classes:
+                    continue
 
-            self._data[DATA_ENTITIES_KEY][entity.entity_id] = entity_data
+                if rule_keys is not None and set(rule_keys).isdisjoint(
+                    entity_rule_keys
+                ):
+                    continue
 
-        except Exception as ex:
-            exc_type, exc_obj, tb = sys.exc_info()
-            line_number = tb.tb_lineno
+                items.append(
+                    {
+                        ATTR_ENTITY_ID: entity_id,
+                        ATTR_AREA_ID: area_id,
+                        ATTR_DOMAIN: domain,
+                        ATTR_DEVICE_CLASS: device_class,
+                        ATTR_RULES: entity_rule_keys,
+                    }
+                )
 
-            _LOGGER.error(
-                f"Failed to load entity, Entity: {entity_data}: Area: {area}, Error: {ex}, Line: {line_number}"
+        return items
+
+    def _query_activity(
+        self, area_ids: list[str], filters: dict[str, Any]
+    ) -> list[dict[str, Any]]:
+        domains = filters.get(ATTR_DOMAIN)
+        rule_keys = filters.get(ATTR_RULE)
+        since = filters.get(ATTR_SINCE)
+
+        since_timestamp = None if since is None else dt_util.as_utc(since).timestamp()
+
+        items = []
+
+        for area_id, transition in self._activity_history.get(
+            area_ids, since_timestamp
+        ):
+            entity_id, old_state, new_state, timestamp = transition
+
+            if domains is not None and entity_id.split(".")[0] not in domains:
+                continue
+
+            if rule_keys is not None and not any(
+                rule_key in rule_keys
+                for rule_key, _area_id in self._entity_memberships.get(entity_id, [])
+            ):
+                continue
+
+            items.append(
+                {
+                    ATTR_ENTITY_ID: entity_id,
+                    ATTR_AREA_ID: area_id,
+                    ATTR_OLD_STATE: old_state,
+                    ATTR_NEW_STATE: new_state,
+                    ATTR_LAST_CHANGED: dt_util.utc_from_timestamp(
+                        timestamp
+                    ).isoformat(),
+                }
             )
 
-    async def _start_listen_entity_change(self):
-        try:
-            _LOGGER.debug("Start listening to entity's changes")
+        return items
 
-            for area_id in self.areas:
-                if area_id not in self._dispatched_areas:
-                    self._dispatched_areas.append(area_id)
+    def _query_rules(
+        self, area_ids: list[str], filters: dict[str, Any]
+    ) -> list[dict[str, Any]]:
+        domains = filters.get(ATTR_DOMAIN)
+        rule_keys = filters.get(ATTR_RULE)
 
-                    async_dispatcher_send(
-                        self.hass,
-                        SIGNAL_AREA_LOADED,
-                        self._config_manager.entry_id,
-                        area_id,
-                    )
+        items = []
 
-            if self._track_state_handler is not None:
-                self._track_state_handler()
+        for rule_key in self._rules:
+            entity_description = self._rules[rule_key]
 
-            entity_ids = list(self.entities.keys())
+            if rule_keys is not None and rule_key not in rule_keys:
+                continue
 
-            self._track_state_handler = async_track_state_change_event(
-                self.hass, entity_ids, self._watched_entity_change
-            )
+            if domains is not None and entity_description.platform not in domains:
+                continue
 
-        except Exception as ex:
-            exc_type, exc_obj, tb = sys.exc_info()
-            line_number = tb.tb_lineno
+            rule_memberships = self._memberships.get(rule_key, {})
 
-            _LOGGER.error(
-                f"Failed to start listening to entity events, Error: {ex}, Line: {line_number}"
+            areas = {
+                area_id: rule_memberships[area_id]
+                for area_id in area_ids
+                if len(rule_memberships.get(area_id, [])) > 0
+            }
+
+            items.append(
+                {
+                    ATTR_RULE: rule_key,
+                    ATTR_NAME: entity_description.name,
+                    ATTR_DOMAIN: entity_description.platform,
+                    ATTR_AGGREGATION: entity_description.aggregation,
+                    ATTR_INCLUDE_NESTED: entity_description.include_nested,
+                    ATTR_FILTER: entity_description.rule_filter,
+                    ATTR_AREAS: areas,
+                }
             )
 
-    async def _watched_entity_change(self, event: Event) -> None:
-        if (to_state := event.data.get("new_state")) is None:
-            return
+        return items
 
-        if (old_state := event.data.get("old_state")) is None:
-            return
+    @staticmethod
+    def _is_relevant_entity(
+        entity_details: dict, entity_description: BaseEntityDescription
+    ) -> bool:
+        entity_id = entity_details.get(ATTR_ENTITY_ID)
+        entity_state = entity_details.get(ATTR_STATE)
+        entity_attributes = {} if entity_state is None else entity_state.attributes
+
+        if not entity_id.startswith(f"{entity_description.platform}."):
+            return False
+
+        if entity_description.attributes is not None:
+            for attribute_key in entity_description.attributes:
+                attributes_values = entity_description.attributes.get(attribute_key)
+                entity_attribute = entity_attributes.get(attribute_key)
+
+                if entity_attribute not in attributes_values:
+                    return False
+
+        aggregation_device_classes = AGGREGATION_DEVICE_CLASSES.get(
+            entity_description.aggregation
+        )
 
-        if to_state.state == old_state.state:
-            return
+        if aggregation_device_classes is not None:
+            device_class = entity_attributes.get(ATTR_DEVICE_CLASS)
 
-        entity_id = event.data.get(ATTR_ENTITY_ID)
-        _LOGGER.debug(
-            f"Entity: {entity_id}, Changed from {old_state.state} to {to_state.state}"
-        )
+            if device_class not in aggregation_device_classes:
+                return False
 
-        self._data[DATA_ENTITIES_KEY][entity_id][ATTR_STATE] = to_state.state
+            is_sum = entity_description.aggregation == AGGREGATION_SUM
 
-        await self.async_request_refresh()
+            if is_sum and device_class != entity_description.device_class:
+                return False
+
+        return True
+
+    def _register_services(self):
+        self.hass.services.async_register(
+            DOMAIN,
+            SERVICE_SET_ATTRIBUTE,
+            self._handle_service_set_attribute,
+            SERVICE_SCHEMA_SET_ATTRIBUTE,
+        )
+
+        self.hass.services.async_register(
+            DOMAIN,
+            SERVICE_REMOVE_ATTRIBUTE,
+            self._handle_service_remove_attribute,
+            SERVICE_SCHEMA_REMOVE_AREA_X,
+        )
+
+        self.hass.services.async_register(
+            DOMAIN,
+            SERVICE_SET_ENTITY,
+            self._handle_service_set_entity,
+            SERVICE_SCHEMA_SET_ENTITY,
+        )
+
+        self.hass.services.async_register(
+            DOMAIN,
+            SERVICE_REMOVE_ENTITY,
+            self._handle_service_remove_entity,
+            SERVICE_SCHEMA_REMOVE_AREA_X,
+        )
+
+        self.hass.services.async_register(
+            DOMAIN,
+            SERVICE_SET_GROUP,
+            self._handle_service_set_group,
+            SERVICE_SCHEMA_SET_GROUP,
+        )
+
+        self.hass.services.async_register(
+            DOMAIN,
+            SERVICE_REMOVE_GROUP,
+            self._handle_service_remove_group,
+            SERVICE_SCHEMA_REMOVE_AREA_X,
+        )
+
+        self.hass.services.async_register(
+            DOMAIN,
+            SERVICE_CONTROL,
+            self._handle_service_control,
+            SERVICE_SCHEMA_CONTROL,
+            SupportsResponse.OPTIONAL,
+        )
+
+        self.hass.services.async_register(
+            DOMAIN,
+            SERVICE_QUERY,
+            self._handle_service_query,
+            SERVICE_SCHEMA_QUERY,
+            SupportsResponse.ONLY,
+        )
+
+        self.hass.services.async_register(
+            DOMAIN,
+            SERVICE_START_RECORDING,
+            self._handle_service_start_recording,
+            SERVICE_SCHEMA_START_RECORDING,
+        )
+
+        self.hass.services.async_register(
+            DOMAIN,
+            SERVICE_STOP_RECORDING,
+            self._handle_service_stop_recording,
+            None,
+            SupportsResponse.OPTIONAL,
+        )
+
+        self.hass.services.async_register(
+            DOMAIN,
+            SERVICE_REPLAY,
+            self._handle_service_replay,
+            SERVICE_SCHEMA_REPLAY,
+            SupportsResponse.OPTIONAL,
+        )
+
+        self.hass.services.async_register(
+            DOMAIN,
+            SERVICE_SET_ACTIVITY_HISTORY,
+            self._handle_service_set_activity_history,
+            SERVICE_SCHEMA_SET_ACTIVITY_HISTORY,
+            SupportsResponse.OPTIONAL,
+        )
+
+    def _handle_service_set_attribute(self, service_call):
+        self.hass.async_create_task(
+            self._async_handle_service_set_attribute(service_call)
+        )
+
+    def _handle_service_remove_attribute(self, service_call):
+        self.hass.async_create_task(
+            self._async_handle_service_remove_attribute(service_call)
+        )
+
+    def _handle_service_set_entity(self, service_call):
+        self.hass.async_create_task(self._async_handle_service_set_entity(service_call))
+
+    def _handle_service_remove_entity(self, service_call):
+        self.hass.async_create_task(
+            self._async_handle_service_remove_entity(service_call)
+        )
+
+    def _handle_service_set_group(self, service_call):
+        self.hass.async_create_task(self._async_handle_service_set_group(service_call))
+
+    def _handle_service_remove_group(self, service_call):
+        self.hass.async_create_task(
+            self._async_handle_service_remove_group(service_call)
+        )
+
+    async def _handle_service_start_recording(self, service_call: ServiceCall):
+        data = service_call.data
+        file_name = data.get(ATTR_FILE_NAME)
+        overwrite = data.get(ATTR_OVERWRITE)
+
+        await self._event_recorder.start(file_name, overwrite)
+
+    async def _handle_service_stop_recording(
+        self, _service_call: ServiceCall
+    ) -> ServiceResponse:
+        result = await self._event_recorder.stop()
+
+        return result
+
+    async def _handle_service_replay(
+        self, service_call: ServiceCall
+    ) -> ServiceResponse:
+        data = service_call.data
+        file_name = data.get(ATTR_FILE_NAME)
+        speed = data.get(ATTR_SPEED)
+
+        replayer = EventReplayer(self.hass, self)
+
+        result = await replayer.replay(file_name, speed)
+
+        return result
+
+    async def _handle_service_set_activity_history(
+        self, service_call: ServiceCall
+    ) -> ServiceResponse:
+        size = service_call.data.get(ATTR_SIZE)
+
+        await self._config_manager.set_activity_history_size(size)
+
+        self._activity_history.resize(size)
+
+        result = self._activity_history.get_usage()
+
+        return result
+
+    async def _handle_service_control(
+        self, service_call: ServiceCall
+    ) -> ServiceResponse:
+        data = service_call.data
+
+        result = await self.control(
+            data.get(ATTR_DOMAIN),
+            data.get(ATTR_SERVICE),
+            data,
+            data.get(ATTR_DRY_RUN),
+        )
+
+        return result
+
+    @callback
+    def _handle_service_query(self, service_call: ServiceCall) -> ServiceResponse:
+        data = service_call.data
+        query = data.get(ATTR_QUERY)
+
+        return self.query(query, data)
+
+    async def _async_handle_service_set_attribute(self, service_call):
+        data = service_call.data
+        name = data.get(ATTR_NAME)
+        options = data.get(ATTR_VALUES)
+
+        await self._config_manager.set_area_attribute(name, options)
+
+        await self._reload_integration()
+
+    async def _async_handle_service_remove_attribute(self, service_call):
+        data = service_call.data
+        name = data.get(ATTR_NAME)
+
+        await self._config_manager.remove_area_attribute(name)
+
+        await self._reload_integration()
+
+    async def _async_handle_service_set_entity(self, service_call):
+        data = service_call.data
+        name = data.get(ATTR_NAME)
+        domain = data.get(ATTR_DOMAIN)
+        attribute = data.get(ATTR_ATTRIBUTE)
+        values = data.get(ATTR_VALUES)
+        include_nested = data.get(ATTR_INCLUDE_NESTED, False)
+        aggregation = data.get(ATTR_AGGREGATION)
+        hold_time = data.get(ATTR_HOLD_TIME)
+        rule_filter = data.get(ATTR_FILTER)
+
+        await self._config_manager.set_area_entity(
+            name,
+            domain,
+            include_nested,
+            attribute,
+            values,
+            aggregation,
+            hold_time,
+            rule_filter,
+        )
+
+        await self._reload_integration()
+
+    async def _async_handle_service_remove_entity(self, service_call):
+        data = service_call.data
+        name = data.get(ATTR_NAME)
+
+        await self._config_manager.remove_area_entity(name)
+
+        await self._reload_integration()
+
+    async def _async_handle_service_set_group(self, service_call):
+        data = service_call.data
+        name = data.get(ATTR_NAME)
+        area_ids = data.get(ATTR_AREA_ID)
+
+        await self._config_manager.set_area_group(name, area_ids)
+
+        await self._reload_integration()
+
+    async def _async_handle_service_remove_group(self, service_call):
+        data = service_call.data
+        name = data.get(ATTR_NAME)
+
+        group_id = await self._config_manager.remove_area_group(name)
+
+        if group_id is None:
+            return
+
+        device = self._dr.async_get_device({(DOMAIN, group_id)})
+
+        if device is not None:
+            self._dr.async_remove_device(device.id)
+
+        await self._reload_integration()
+
+    async def _reload_integration(self):
+        data = {ENTITY_CONFIG_ENTRY_ID: self.config_entry.entry_id}
+
+        await self.hass.services.async_call(HA_NAME, SERVICE_RELOAD_CONFIG_ENTRY, data)
+
+    async def _handle_area_or_entity_changed_event(self, event: Event):
+        self._event_recorder.record(event)
+
+        await self._reload_data()
+
+    async def _reload_data(self):
+        """Rebuild from the registries, requests while one is waiting coalesce."""
+        if self._is_reload_pending:
+            return
+
+        self._is_reload_pending = True
+
+        async with self._reload_lock:
+            self._is_reload_pending = False
+
+            try:
+                await self._rebuild_data()
+
+            except Exception as ex:
+                exc_type, exc_obj, tb = sys.exc_info()
+                line_number = tb.tb_lineno
+
+                _LOGGER.error(
+                    f"Failed to reload data, Error: {ex}, Line: {line_number}"
+                )
+
+    async def _rebuild_data(self):
+        snapshot = self._get_registry_snapshot()
+
+        started_at = time.monotonic()
+
+        build = await self.hass.async_add_executor_job(build_registry, snapshot)
+
+        _LOGGER.debug(
+            f"Built {len(build.areas)} areas and {len(build.entities)} entities "
+            f"in {round((time.monotonic() - started_at) * 1000, 3)}ms"
+        )
+
+        registry_fingerprint = self._registry_fingerprint
+
+        areas_diff, entities_diff = self._apply_registry_build(build)
+
+        if len(areas_diff.removed) > 0:
+            for area_id in areas_diff.removed:
+                await self._remove_area(area_id)
+
+            self._load_nested_areas()
+
+        if areas_diff.has_structural_changes:
+            self._load_memberships()
+
+        else:
+            self._update_memberships(entities_diff)
+
+        if areas_diff.has_changes or entities_diff.has_changes:
+            self._version += 1
+
+        for area_id in areas_diff.changed:
+            self._rename_area(area_id)
+
+        await self._start_listen_entity_change()
+
+        if areas_diff.has_changes or entities_diff.has_changes:
+            self.async_update_listeners()
+
+        if (
+            areas_diff.has_changes
+            or entities_diff.has_changes
+            or registry_fingerprint != self._registry_fingerprint
+        ):
+            self._save_snapshot()
+
+    async def _handle_device_changed_event(self, event: Event):
+        self._event_recorder.record(event)
+
+        if event.data.get("action") != "update":
+            return
+
+        async with self._reload_lock:
+            await self._update_device(
+                event.data.get("device_id"), event.data.get("changes", {})
+            )
+
+    async def _update_device(self, device_id: str, changes: dict):
+        entities_diff = RegistryDiff()
+
+        if ATTR_AREA_ID in changes:
+            entity_ids = self._device_entities.get(device_id, [])
+
+            _LOGGER.debug(
+                f"Device: {device_id}, Area changed, Inheriting entities: {entity_ids}"
+            )
+
+            if len(entity_ids) > 0:
+                entities_diff = self._load_entities(entity_ids)
+
+        if any(field in changes for field in RULE_FILTER_DEVICE_FIELDS):
+            for entity_id in self._device_entity_ids.get(device_id, set()):
+                entity = self._entity_entries[entity_id]
+
+                self._registry_index.set_entity(
+                    entity_id, get_registry_index_fields(entity, self._dr.devices)
+                )
+
+                if entity_id not in entities_diff.added:
+                    entities_diff.changed.add(entity_id)
+
+        if not entities_diff.has_changes:
+            return
+
+        self._update_memberships(entities_diff)
+
+        self._version += 1
+
+        if entities_diff.has_structural_changes:
+            await self._start_listen_entity_change()
+
+        self.async_update_listeners()
+
+        self._save_snapshot()
+
+    async def _restore_snapshot(self) -> bool:
+        try:
+            snapshot = await self._config_manager.load_snapshot()
+
+            if snapshot is None:
+                _LOGGER.debug("No snapshot available, performing full load")
+
+                return False
+
+            config_fingerprint = snapshot.get(SNAPSHOT_CONFIG_FINGERPRINT)
+
+            if config_fingerprint != self._get_config_fingerprint():
+                _LOGGER.debug(
+                    "Configuration changed since snapshot, performing full load"
+                )
+
+                return False
+
+            entities = snapshot.get(DATA_ENTITIES_KEY, {})
+
+            for entity_id in entities:
+                entities[entity_id][ATTR_STATE] = self.hass.states.get(entity_id)
+
+            self._data[DATA_AREAS_KEY] = snapshot.get(DATA_AREAS_KEY, {})
+            self._data[DATA_ENTITIES_KEY] = entities
+
+            self._area_entities = {area_id: [] for area_id in self.areas}
+
+            for entity_id in entities:
+                area_id = entities[entity_id].get(ATTR_AREA_ID)
+
+                self._area_entities.setdefault(area_id, []).append(entity_id)
+
+            self._device_entities = snapshot.get(SNAPSHOT_DEVICE_ENTITIES, {})
+
+            entity_descriptions = self._get_all_entity_descriptions()
+
+            self._rules = {
+                entity_description.key: entity_description
+                for entity_description in entity_descriptions
+                if entity_description.platform in ENTITY_PLATFORMS
+            }
+
+            self._load_rule_predicates()
+            self._load_membership_attributes()
+            self._load_groups()
+
+            memberships = snapshot.get(SNAPSHOT_MEMBERSHIPS, {})
+            entity_memberships = snapshot.get(SNAPSHOT_ENTITY_MEMBERSHIPS, {})
+
+            self._memberships = {
+                rule_key: memberships.get(rule_key, {}) for rule_key in self._rules
+            }
+
+            self._entity_memberships = {
+                entity_id: [
+                    (rule_key, area_id)
+                    for rule_key, area_id in entity_memberships[entity_id]
+                ]
+                for entity_id in entity_memberships
+            }
+
+            self._aggregation_manager.load(
+                list(self._rules.values()),
+                self._memberships,
+                self.get_rollup_areas,
+                [*self.areas.keys(), *self._groups.keys()],
+            )
+
+            self._registry_fingerprint = snapshot.get(SNAPSHOT_FINGERPRINT)
+            self._config_fingerprint = config_fingerprint
+            self._version += 1
+
+            _LOGGER.debug(
+                f"Restored snapshot of {len(self.areas)} areas, "
+                f"{len(self.entities)} entities and {len(self._rules)} rules"
+            )
+
+            return True
+
+        except Exception as ex:
+            exc_type, exc_obj, tb = sys.exc_info()
+            line_number = tb.tb_lineno
+
+            _LOGGER.error(
+                f"Failed to restore snapshot, Error: {ex}, Line: {line_number}"
+            )
+
+            self._data = {}
+            self._area_entities = {}
+            self._device_entities = {}
+            self._memberships = {}
+            self._entity_memberships = {}
+
+            return False
+
+    async def _reconcile_snapshot(self):
+        try:
+            for entity_id in list(self.entities.keys()):
+                entity = self._er.async_get(entity_id)
+                area_id = self.entities[entity_id].get(ATTR_AREA_ID)
+
+                if entity is not None and area_id in self.areas:
+                    self._load_entity(entity, self.areas.get(area_id))
+
+            # Restored entities were tracked before their registry index was loaded
+            self._update_tracked_entities()
+
+            fingerprint = get_registry_fingerprint(self._get_registry_snapshot())
+
+            if fingerprint == self._registry_fingerprint:
+                _LOGGER.debug("Snapshot is up to date with the registries")
+
+                return
+
+            _LOGGER.debug("Registries changed since snapshot, reconciling")
+
+            # Restored entities already hold the current registry entries, the
+            # rebuild finds no change to them, their memberships are reloaded here
+            self._load_memberships()
+
+            await self._reload_data()
+
+        except Exception as ex:
+            exc_type, exc_obj, tb = sys.exc_info()
+            line_number = tb.tb_lineno
+
+            _LOGGER.error(
+                f"Failed to reconcile snapshot, Error: {ex}, Line: {line_number}"
+            )
+
+    def _save_snapshot(self):
+        self._config_manager.save_snapshot(self._get_snapshot_data)
+
+    def _get_snapshot_data(self) -> dict:
+        """Registry fingerprint is the one of the last applied build.
+
+        Incremental updates keep it, the next start reconciles the snapshot.
+        """
+        entities = {
+            entity_id: {
+                key: value
+                for key, value in self.entities[entity_id].items()
+                if key != ATTR_STATE
+            }
+            for entity_id in self.entities
+        }
+
+        data = {
+            SNAPSHOT_FINGERPRINT: self._registry_fingerprint,
+            SNAPSHOT_CONFIG_FINGERPRINT: self._config_fingerprint,
+            DATA_AREAS_KEY: self.areas,
+            DATA_ENTITIES_KEY: entities,
+            SNAPSHOT_DEVICE_ENTITIES: self._device_entities,
+            SNAPSHOT_MEMBERSHIPS: self._memberships,
+            SNAPSHOT_ENTITY_MEMBERSHIPS: self._entity_memberships,
+        }
+
+        return data
+
+    def _get_config_fingerprint(self) -> str:
+        config = [
+            self._config_manager.area_parents,
+            self._config_manager.area_entities,
+            self._config_manager.area_groups,
+        ]
+
+        result = get_fingerprint(config)
+
+        return result
+
+    async def _remove_area(self, area_id: str):
+        try:
+            _LOGGER.debug(f"Removing area: {area_id}")
+
+            await self._config_manager.remove_area(area_id)
+
+            self._activity_history.remove_area(area_id)
+
+            device = self._dr.async_get_device({(DOMAIN, area_id)})
+
+            if device is not None:
+                self._dr.async_remove_device(device.id)
+
+        except Exception as ex:
+            exc_type, exc_obj, tb = sys.exc_info()
+            line_number = tb.tb_lineno
+
+            _LOGGER.error(
+                f"Failed to remove area, Area: {area_id}, Error: {ex}, Line: {line_number}"
+            )
+
+    def _rename_area(self, area_id: str):
+        try:
+            area_name = self.get_area_name(area_id)
+
+            _LOGGER.debug(f"Renaming area: {area_id}, Name: {area_name}")
+
+            device = self._dr.async_get_device({(DOMAIN, area_id)})
+
+            if device is not None and device.name != area_name:
+                self._dr.async_update_device(device.id, name=area_name)
+
+            async_dispatcher_send(
+                self.hass,
+                SIGNAL_AREA_RENAMED,
+                self._config_manager.entry_id,
+                area_id,
+            )
+
+        except Exception as ex:
+            exc_type, exc_obj, tb = sys.exc_info()
+            line_number = tb.tb_lineno
+
+            _LOGGER.error(
+                f"Failed to rename area, Area: {area_id}, Error: {ex}, Line: {line_number}"
+            )
+
+    def get_area_parent_id(self, area_id: str) -> str | None:
+        area_parent = self._config_manager.area_parents.get(area_id)
+
+        return area_parent
+
+    def get_area_ancestors(self, area_id: str) -> list[str]:
+        ancestors = []
+        parent_area_id = self.get_area_parent_id(area_id)
+
+        while parent_area_id is not None and parent_area_id not in ancestors:
+            if parent_area_id == area_id:
+                break
+
+            ancestors.append(parent_area_id)
+
+            parent_area_id = self.get_area_parent_id(parent_area_id)
+
+        return ancestors
+
+    def get_rollup_areas(self, area_id: str, include_nested: bool) -> list[str]:
+        ancestors = self.get_area_ancestors(area_id) if include_nested else []
+
+        group_ids = []
+
+        for lookup_area_id in [area_id, *ancestors]:
+            for group_id in self._area_groups.get(lookup_area_id, []):
+                if group_id not in group_ids:
+                    group_ids.append(group_id)
+
+        result = [*ancestors, *group_ids]
+
+        return result
+
+    def _load_groups(self):
+        self._groups = {}
+        self._area_groups = {}
+
+        area_groups = self._config_manager.area_groups
+
+        for group_id in area_groups:
+            group = area_groups[group_id]
+
+            area_ids = [
+                area_id
+                for area_id in group.get(ATTR_AREA_ID, [])
+                if area_id in self.areas
+            ]
+
+            self._groups[group_id] = {
+                ATTR_NAME: group.get(ATTR_NAME),
+                ATTR_AREA_ID: area_ids,
+            }
+
+            for area_id in area_ids:
+                self._area_groups.setdefault(area_id, []).append(group_id)
+
+        _LOGGER.debug(f"Loaded {len(self._groups)} area groups")
+
+    def _get_nested_area(self, area_id: str) -> list[str]:
+        result = get_nested_areas(area_id, self._config_manager.area_parents)
+
+        return result
+
+    def _get_registry_snapshot(self) -> RegistrySnapshot:
+        snapshot = RegistrySnapshot(
+            areas=tuple(self._ar.areas.values()),
+            entities=tuple(self._er.entities.values()),
+            devices=dict(self._dr.devices),
+            area_parents=dict(self._config_manager.area_parents),
+        )
+
+        return snapshot
+
+    def _apply_registry_build(
+        self, build: RegistryBuild
+    ) -> tuple[RegistryDiff, RegistryDiff]:
+        """Diff the build against the loaded data and swap it in at once.
+
+        Unchanged entities keep their loaded details (including the state),
+        added and changed ones take the current state.
+        """
+        areas_diff = RegistryDiff()
+        entities_diff = RegistryDiff()
+
+        areas = self.areas
+        entities = self.entities
+
+        areas_diff.removed = set(areas.keys()) - set(build.areas.keys())
+
+        for area_id in build.areas:
+            area_details = areas.get(area_id)
+
+            if area_details is None:
+                areas_diff.added.add(area_id)
+
+            elif area_details.get(ATTR_NAME) != build.areas[area_id].get(ATTR_NAME):
+                areas_diff.changed.add(area_id)
+
+        entities_diff.removed = set(entities.keys()) - set(build.entities.keys())
+
+        for entity_id in build.entities:
+            entity_data = build.entities[entity_id]
+            entity_details = entities.get(entity_id)
+
+            if entity_details is None:
+                entities_diff.added.add(entity_id)
+
+            elif (
+                self._entity_entries.get(entity_id)
+                is not build.entity_entries[entity_id]
+                or entity_details.get(ATTR_AREA_ID) != entity_data.get(ATTR_AREA_ID)
+                or entity_details.get(ATTR_NAME) != entity_data.get(ATTR_NAME)
+            ):
+                entities_diff.changed.add(entity_id)
+
+            else:
+                build.entities[entity_id] = entity_details
+                continue
+
+            entity_data[ATTR_STATE] = self.hass.states.get(entity_id)
+
+        self._data[DATA_AREAS_KEY] = build.areas
+        self._data[DATA_ENTITIES_KEY] = build.entities
+        self._entity_entries = build.entity_entries
+        self._area_entities = build.area_entities
+        self._device_entities = build.device_entities
+        self._device_entity_ids = build.device_entity_ids
+        self._registry_index = build.registry_index
+        self._registry_fingerprint = build.fingerprint
+
+        for area_id in areas_diff.removed:
+            if area_id in self._dispatched_areas:
+                self._dispatched_areas.remove(area_id)
+
+        if areas_diff.has_changes:
+            self._areas_version += 1
+
+        if entities_diff.has_changes:
+            self._entities_version += 1
+
+        _LOGGER.debug(
+            f"Applied registry build, Areas: {areas_diff}, Entities: {entities_diff}, "
+            f"Version: {self._areas_version}/{self._entities_version}"
+        )
+
+        return areas_diff, entities_diff
+
+    def _load_nested_areas(self):
+        for area_id in self.areas:
+            self._data[DATA_AREAS_KEY][area_id][ATTR_NESTED] = self._get_nested_area(
+                area_id
+            )
+
+    def _load_entities(self, entity_ids: list[str]) -> RegistryDiff:
+        diff = RegistryDiff()
+
+        try:
+            _LOGGER.debug("Start loading entities")
+
+            entities = self._data.setdefault(DATA_ENTITIES_KEY, {})
+            current_entities = self._get_relevant_entities(entity_ids)
+
+            loaded_entity_ids = [
+                entity_id for entity_id in entity_ids if entity_id in entities
+            ]
+
+            for entity_id in loaded_entity_ids:
+                if entity_id not in current_entities:
+                    self._remove_entity(entity_id)
+
+                    diff.removed.add(entity_id)
+
+            for entity_id in current_entities:
+                entity, area_id = current_entities[entity_id]
+                area = self.areas.get(area_id)
+
+                entity_details = entities.get(entity_id)
+
+                if entity_details is None:
+                    diff.added.add(entity_id)
+
+                elif (
+                    self._entity_entries.get(entity_id) is not entity
+                    or entity_details.get(ATTR_AREA_ID) != area_id
+                    or entity_details.get(ATTR_NAME) != area.get(ATTR_NAME)
+                ):
+                    diff.changed.add(entity_id)
+
+                else:
+                    continue
+
+                self._load_entity(entity, area)
+
+            if diff.has_changes:
+                self._entities_version += 1
+
+                _LOGGER.debug(
+                    f"Loaded {len(entities)} entities, {diff}, "
+                    f"Version: {self._entities_version}"
+                )
+
+            else:
+                _LOGGER.debug("No changes for entity list")
+
+        except Exception as ex:
+            exc_type, exc_obj, tb = sys.exc_info()
+            line_number = tb.tb_lineno
+
+            _LOGGER.error(f"Failed to load entities, Error: {ex}, Line: {line_number}")
+
+        return diff
+
+    def _load_memberships(self):
+        try:
+            _LOGGER.debug("Start loading rule memberships")
+
+            entity_descriptions = self._get_all_entity_descriptions()
+
+            self._rules = {
+                entity_description.key: entity_description
+                for entity_description in entity_descriptions
+                if entity_description.platform in ENTITY_PLATFORMS
+            }
+
+            self._memberships = {rule_key: {} for rule_key in self._rules}
+            self._entity_memberships = {}
+            self._config_fingerprint = self._get_config_fingerprint()
+
+            self._load_rule_predicates()
+            self._load_membership_attributes()
+            self._load_groups()
+
+            rule_candidates = {
+                rule_key: self._rule_predicates[rule_key].evaluate(self._registry_index)
+                for rule_key in self._rule_predicates
+            }
+
+            for entity_id in self.entities:
+                self._load_entity_memberships(entity_id, rule_candidates)
+
+            self._aggregation_manager.load(
+                list(self._rules.values()),
+                self._memberships,
+                self.get_rollup_areas,
+                [*self.areas.keys(), *self._groups.keys()],
+            )
+
+            _LOGGER.debug(f"Loaded memberships of {len(self._rules)} rules")
+
+        except Exception as ex:
+            exc_type, exc_obj, tb = sys.exc_info()
+            line_number = tb.tb_lineno
+
+            _LOGGER.error(
+                f"Failed to load rule memberships, Error: {ex}, Line: {line_number}"
+            )
+
+    def _update_memberships(self, entities_diff: RegistryDiff):
+        for entity_id in entities_diff.removed:
+            self._remove_entity_memberships(entity_id)
+
+            self._aggregation_manager.set_member_rules(entity_id, [])
+
+        for entity_id in entities_diff.added | entities_diff.changed:
+            self._remove_entity_memberships(entity_id)
+
+            member_rules = self._load_entity_memberships(entity_id)
+            self._aggregation_manager.set_member_rules(entity_id, member_rules)
+
+    def _remove_entity_memberships(self, entity_id: str):
+        member_rules = self._entity_memberships.pop(entity_id, [])
+
+        for rule_key, area_id in member_rules:
+            area_members = self._memberships.get(rule_key, {}).get(area_id, [])
+
+            if entity_id in area_members:
+                area_members.remove(entity_id)
+
+    def _load_entity_memberships(
+        self, entity_id: str, rule_candidates: dict[str, set[str]] | None = None
+    ) -> list[tuple[str, str]]:
+        entity_details = self.entities.get(entity_id)
+        area_id = entity_details.get(ATTR_AREA_ID)
+        member_rules = []
+
+        for rule_key in self._rules:
+            entity_description = self._rules[rule_key]
+            area_members = self._memberships[rule_key].setdefault(area_id, [])
+
+            is_member = entity_id in area_members
+            is_relevant = self._is_matching_rule_filter(
+                entity_id, rule_key, rule_candidates
+            ) and self._is_relevant_entity(entity_details, entity_description)
+
+            if is_relevant:
+                member_rules.append((rule_key, area_id))
+
+                if not is_member:
+                    area_members.append(entity_id)
+
+            elif is_member:
+                area_members.remove(entity_id)
+
+        self._entity_memberships[entity_id] = member_rules
+
+        return member_rules
+
+    def _is_matching_rule_filter(
+        self,
+        entity_id: str,
+        rule_key: str,
+        rule_candidates: dict[str, set[str]] | None = None,
+    ) -> bool:
+        predicate = self._rule_predicates.get(rule_key)
+
+        if predicate is None:
+            return True
+
+        if rule_candidates is not None:
+            return entity_id in rule_candidates[rule_key]
+
+        result = predicate.matches(entity_id, self._registry_index)
+
+        return result
+
+    def _load_rule_predicates(self):
+        self._rule_predicates = {}
+
+        for rule_key in self._rules:
+            rule_filter = self._rules[rule_key].rule_filter
+
+            if rule_filter is not None:
+                self._rule_predicates[rule_key] = compile_rule_filter(rule_filter)
+
+    def _load_membership_attributes(self):
+        attributes = set()
+
+        for entity_description in self._rules.values():
+            if entity_description.attributes is not None:
+                attributes.update(entity_description.attributes.keys())
+
+            if entity_description.aggregation in AGGREGATION_DEVICE_CLASSES:
+                attributes.add(ATTR_DEVICE_CLASS)
+
+        self._membership_attributes = frozenset(attributes)
+
+    def _get_relevant_entities(
+        self, entity_ids: list[str]
+    ) -> dict[str, tuple[RegistryEntry, str]]:
+        result: dict[str, tuple[RegistryEntry, str]] = {}
+
+        try:
+            all_devices = self._dr.devices
+
+            registry_entities = [
+                self._er.entities.get(entity_id)
+                for entity_id in entity_ids
+                if entity_id in self._er.entities
+            ]
+
+            for entity in registry_entities:
+                if entity.domain not in ENTITY_PLATFORMS:
+                    continue
+
+                if entity.platform == DOMAIN:
+                    continue
+
+                area_id = entity.area_id
+
+                if entity.area_id is None and entity.device_id is not None:
+                    device = all_devices.get(entity.device_id)
+                    area_id = None if device is None else device.area_id
+
+                if area_id in self.areas:
+                    result[entity.entity_id] = (entity, area_id)
+
+        except Exception as ex:
+            exc_type, exc_obj, tb = sys.exc_info()
+            line_number = tb.tb_lineno
+
+            _LOGGER.error(
+                f"Failed to get relevant entities, Error: {ex}, Line: {line_number}"
+            )
+
+        return result
+
+    def _load_entity(self, entity: RegistryEntry, area: dict):
+        entity_data = entity.as_partial_dict
+
+        try:
+            entity_id = entity.entity_id
+            area_id = area.get(ATTR_AREA_ID)
+
+            entity_data[ATTR_AREA_ID] = area_id
+            entity_data[ATTR_NAME] = area.get(ATTR_NAME)
+
+            entity_data[ATTR_DOMAIN] = entity.domain
+            entity_data[ATTR_STATE] = self.hass.states.get(entity_id)
+
+            previous_entity_data = self.entities.get(entity_id)
+
+            if previous_entity_data is not None:
+                previous_area_id = previous_entity_data.get(ATTR_AREA_ID)
+
+                if previous_area_id != area_id:
+                    self._area_entities[previous_area_id].remove(entity_id)
+
+                    self._area_entities.setdefault(area_id, []).append(entity_id)
+
+            else:
+                self._area_entities.setdefault(area_id, []).append(entity_id)
+
+            self._data[DATA_ENTITIES_KEY][entity_id] = entity_data
+
+            self._remove_device_entity_id(entity_id)
+
+            self._entity_entries[entity_id] = entity
+
+            if entity.device_id is not None:
+                self._device_entity_ids.setdefault(entity.device_id, set()).add(
+                    entity_id
+                )
+
+            self._registry_index.set_entity(
+                entity_id, get_registry_index_fields(entity, self._dr.devices)
+            )
+
+        except Exception as ex:
+            exc_type, exc_obj, tb = sys.exc_info()
+            line_number = tb.tb_lineno
+
+            _LOGGER.error(
+                f"Failed to load entity, Entity: {entity_data}: Area: {area}, Error: {ex}, Line: {line_number}"
+            )
+
+    def _remove_entity(self, entity_id: str):
+        entity_data = self._data[DATA_ENTITIES_KEY].pop(entity_id)
+        area_id = entity_data.get(ATTR_AREA_ID)
+
+        area_entities = self._area_entities.get(area_id, [])
+
+        if entity_id in area_entities:
+            area_entities.remove(entity_id)
+
+        self._remove_device_entity_id(entity_id)
+
+        self._entity_entries.pop(entity_id, None)
+        self._registry_index.remove_entity(entity_id)
+
+    def _remove_device_entity_id(self, entity_id: str):
+        entity = self._entity_entries.get(entity_id)
+
+        if entity is None or entity.device_id is None:
+            return
+
+        entity_ids = self._device_entity_ids.get(entity.device_id, set())
+        entity_ids.discard(entity_id)
+
+        if len(entity_ids) == 0:
+            self._device_entity_ids.pop(entity.device_id, None)
+
+    async def _start_listen_entity_change(self):
+        try:
+            _LOGGER.debug("Start listening to entity's changes")
+
+            for area_id in [*self.areas.keys(), *self._groups.keys()]:
+                if area_id not in self._dispatched_areas:
+                    self._dispatched_areas.append(area_id)
+
+                    async_dispatcher_send(
+                        self.hass,
+                        SIGNAL_AREA_LOADED,
+                        self._config_manager.entry_id,
+                        area_id,
+                    )
+
+            self._update_tracked_entities()
+
+        except Exception as ex:
+            exc_type, exc_obj, tb = sys.exc_info()
+            line_number = tb.tb_lineno
+
+            _LOGGER.error(
+                f"Failed to start listening to entity events, Error: {ex}, Line: {line_number}"
+            )
+
+    def _update_tracked_entities(self):
+        """Subscribe to new entities before unsubscribing the removed ones."""
+        entity_ids = {
+            entity_id
+            for entity_id in self.entities
+            if self._is_rule_candidate(entity_id)
+        }
+        tracked_entity_ids = set(self._track_state_handlers.keys())
+
+        added_entity_ids = entity_ids - tracked_entity_ids
+        removed_entity_ids = tracked_entity_ids - entity_ids
+
+        for entity_id in added_entity_ids:
+            self._track_state_handlers[entity_id] = async_track_state_change_event(
+                self.hass, entity_id, self._watched_entity_change
+            )
+
+        for entity_id in removed_entity_ids:
+            remove_listener = self._track_state_handlers.pop(entity_id)
+            remove_listener()
+
+        if len(added_entity_ids) > 0 or len(removed_entity_ids) > 0:
+            _LOGGER.debug(
+                f"Tracked entities updated, Added: {len(added_entity_ids)}, "
+                f"Removed: {len(removed_entity_ids)}, Total: {len(entity_ids)}"
+            )
+
+    def _is_rule_candidate(self, entity_id: str) -> bool:
+        """Whether any rule can match the entity regardless of its state."""
+        result = any(
+            entity_id.startswith(f"{self._rules[rule_key].platform}.")
+            and self._is_matching_rule_filter(entity_id, rule_key)
+            for rule_key in self._rules
+        )
+
+        return result
+
+    @callback
+    def _watched_entity_change(self, event: Event) -> None:
+        self._event_recorder.record(event)
+
+        if (to_state := event.data.get("new_state")) is None:
+            return
+
+        entity_id = event.data.get(ATTR_ENTITY_ID)
+        old_state = event.data.get("old_state")
+
+        if old_state is None:
+            _LOGGER.debug(f"Entity: {entity_id}, Became available as {to_state.state}")
+
+            self._data[DATA_ENTITIES_KEY][entity_id][ATTR_STATE] = to_state
+
+            member_rules = self._load_entity_memberships(entity_id)
+            self._aggregation_manager.set_member_rules(entity_id, member_rules)
+
+            self._record_activity(entity_id, old_state, to_state)
+
+            self._save_snapshot()
+
+            return
+
+        is_state_changed = to_state.state != old_state.state
+
+        is_membership_changed = self._is_attributes_changed(
+            self._membership_attributes, old_state, to_state
+        )
+
+        is_watched_changed = self._is_attributes_changed(
+            self._aggregation_manager.get_watched_attributes(entity_id),
+            old_state,
+            to_state,
+        )
+
+        if not (is_state_changed or is_membership_changed or is_watched_changed):
+            return
+
+        _LOGGER.debug(
+            f"Entity: {entity_id}, Changed from {old_state.state} to {to_state.state}"
+        )
+
+        self._data[DATA_ENTITIES_KEY][entity_id][ATTR_STATE] = to_state
+
+        if is_membership_changed:
+            member_rules = self._load_entity_memberships(entity_id)
+            self._aggregation_manager.set_member_rules(entity_id, member_rules)
+
+            if is_state_changed:
+                self._record_activity(entity_id, old_state, to_state)
+
+            self._save_snapshot()
+
+            return
+
+        if is_state_changed:
+            self._record_activity(entity_id, old_state, to_state)
+
+        self._aggregation_manager.queue_update(entity_id, to_state)
+
+    def _record_activity(
+        self, entity_id: str, old_state: State | None, new_state: State
+    ):
+        if len(self._entity_memberships.get(entity_id, [])) == 0:
+            return
+
+        self._activity_history.append(
+            self.entities[entity_id].get(ATTR_AREA_ID),
+            entity_id,
+            None if old_state is None else old_state.state,
+            new_state.state,
+            new_state.last_changed.timestamp(),
+        )
+
+    @staticmethod
+    def _is_attributes_changed(
+        attributes: frozenset[str], old_state: State, new_state: State
+    ) -> bool:
+        result = any(
+            old_state.attributes.get(attribute) != new_state.attributes.get(attribute)
+            for attribute in attributes
+        )
+
+        return result
 
     async def _async_update_data(self):
         """Fetch data from API endpoint.
@@ -0,0 +1,111 @@
+from collections.abc import Callable, Hashable
+from datetime import datetime
+import heapq
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+
+_LOGGER = logging.getLogger(__name__)
+
+QUEUE_COMPACTION_FACTOR = 4
+
+
+class HoldTimerScheduler:
+    """Single timer serving all hold deadlines, earliest deadline first."""
+
+    def __init__(self, hass: HomeAssistant, action: Callable[[list[Hashable]], None]):
+        self._hass = hass
+        self._action = action
+
+        self._deadlines: dict[Hashable, datetime] = {}
+        self._queue: list[tuple[datetime, Hashable]] = []
+
+        self._timer_handler = None
+        self._timer_deadline: datetime | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._deadlines)
+
+    def schedule(self, key: Hashable, deadline: datetime):
+        if self._deadlines.get(key) == deadline:
+            return
+
+        self._deadlines[key] = deadline
+
+        heapq.heappush(self._queue, (deadline, key))
+
+        self._compact()
+        self._arm()
+
+    def cancel(self, key: Hashable):
+        if self._deadlines.pop(key, None) is not None:
+            self._compact()
+            self._arm()
+
+    def clear(self):
+        self._deadlines = {}
+        self._queue = []
+
+        self._disarm()
+
+    def _compact(self):
+        if len(self._queue) > QUEUE_COMPACTION_FACTOR * (len(self._deadlines) + 1):
+            self._queue = [(deadline, key) for key, deadline in self._deadlines.items()]
+
+            heapq.heapify(self._queue)
+
+    def _arm(self):
+        while len(self._queue) > 0:
+            deadline, key = self._queue[0]
+
+            if self._deadlines.get(key) == deadline:
+                break
+
+            heapq.heappop(self._queue)
+
+        if len(self._queue) == 0:
+            self._disarm()
+            return
+
+        next_deadline = self._queue[0][0]
+
+        if self._timer_deadline is not None and self._timer_deadline <= next_deadline:
+            return
+
+        self._disarm()
+
+        self._timer_deadline = next_deadline
+        self._timer_handler = async_track_point_in_utc_time(
+            self._hass, self._handle_timer, next_deadline
+        )
+
+    def _disarm(self):
+        if self._timer_handler is not None:
+            self._timer_handler()
+
+        self._timer_handler = None
+        self._timer_deadline = None
+
+    @callback
+    def _handle_timer(self, now: datetime):
+        self._timer_handler = None
+        self._timer_deadline = None
+
+        due_keys = []
+
+        while len(self._queue) > 0 and self._queue[0][0] <= now:
+            deadline, key = heapq.heappop(self._queue)
+
+            if self._deadlines.get(key) == deadline:
+                self._deadlines.pop(key)
+
+                due_keys.append(key)
+
+        self._arm()
+
+        if len(due_keys) > 0:
+            _LOGGER.debug(f"Hold timers expired: {due_keys}")
+
+            self._action(due_keys)
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+import logging
+from typing import TYPE_CHECKING, Any
+
+from jinja2 import pass_context
+
+from homeassistant.const import ATTR_NAME, MAJOR_VERSION, MINOR_VERSION
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import template
+
+from ..common.consts import (
+    ATTR_NESTED,
+    TEMPLATE_AREA_ATTRIBUTE,
+    TEMPLATE_FUNCTIONS_MAX_VERSION,
+    TEMPLATE_FUNCTIONS_MIN_VERSION,
+    TEMPLATE_NESTED_AREA_ENTITIES,
+    TEMPLATE_NESTED_AREAS,
+)
+
+if TYPE_CHECKING:
+    from .ha_coordinator import HACoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# HA has no public hook for template functions, the shared environments are
+# internal to HA, used only by the versions the functions were verified with
+TEMPLATE_ENVIRONMENTS = [
+    (getattr(template, "_ENVIRONMENT", None), False),
+    (getattr(template, "_ENVIRONMENT_STRICT", None), True),
+]
+
+
+class TemplateManager:
+    """Template functions of nested areas, cached until the area model changes.
+
+    Functions are added to the shared template environments of HA only,
+    limited environments and the ones created per template are not covered.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: HACoordinator):
+        self._hass = hass
+        self._coordinator = coordinator
+
+        self._cache: dict[tuple, Any] = {}
+        self._cache_version: int | None = None
+
+    @property
+    def is_supported(self) -> bool:
+        version = (MAJOR_VERSION, MINOR_VERSION)
+
+        result = (
+            TEMPLATE_FUNCTIONS_MIN_VERSION <= version <= TEMPLATE_FUNCTIONS_MAX_VERSION
+            and hasattr(template, "TemplateEnvironment")
+            and all(
+                environment_key is not None
+                for environment_key, _strict in TEMPLATE_ENVIRONMENTS
+            )
+        )
+
+        return result
+
+    def initialize(self):
+        if not self.is_supported:
+            _LOGGER.warning(
+                f"Template functions are not supported by HA {MAJOR_VERSION}.{MINOR_VERSION}, "
+                "use the query service or the websocket API instead"
+            )
+
+            return
+
+        functions = {
+            TEMPLATE_NESTED_AREAS: self.nested_areas,
+            TEMPLATE_NESTED_AREA_ENTITIES: self.nested_area_entities,
+            TEMPLATE_AREA_ATTRIBUTE: self.area_attribute,
+        }
+
+        for environment_key, strict in TEMPLATE_ENVIRONMENTS:
+            environment = self._hass.data.get(environment_key)
+
+            if environment is None:
+                environment = template.TemplateEnvironment(self._hass, False, strict)
+
+                self._hass.data[environment_key] = environment
+
+            for name in functions:
+                function = self._as_template_function(functions[name])
+
+                environment.globals[name] = function
+                environment.filters[name] = function
+
+        _LOGGER.debug(f"Template functions registered: {list(functions.keys())}")
+
+    def terminate(self):
+        self._cache = {}
+
+        if not self.is_supported:
+            return
+
+        for environment_key, _strict in TEMPLATE_ENVIRONMENTS:
+            environment = self._hass.data.get(environment_key)
+
+            if environment is None:
+                continue
+
+            for name in [
+                TEMPLATE_NESTED_AREAS,
+                TEMPLATE_NESTED_AREA_ENTITIES,
+                TEMPLATE_AREA_ATTRIBUTE,
+            ]:
+                environment.globals.pop(name, None)
+                environment.filters.pop(name, None)
+
+    def nested_areas(self, area_id_or_name: str) -> tuple[str, ...]:
+        result = self._get_cached(
+            (TEMPLATE_NESTED_AREAS, area_id_or_name),
+            self._get_nested_areas,
+            area_id_or_name,
+        )
+
+        return result
+
+    def nested_area_entities(self, area_id_or_name: str) -> tuple[str, ...]:
+        result = self._get_cached(
+            (TEMPLATE_NESTED_AREA_ENTITIES, area_id_or_name),
+            self._get_nested_area_entities,
+            area_id_or_name,
+        )
+
+        return result
+
+    def area_attribute(self, area_id_or_name: str, attribute: str) -> Any:
+        result = self._get_cached(
+            (TEMPLATE_AREA_ATTRIBUTE, area_id_or_name, attribute),
+            self._get_area_attribute,
+            area_id_or_name,
+            attribute,
+        )
+
+        return result
+
+    @staticmethod
+    def _as_template_function(function: Callable) -> Callable:
+        def wrapper(_context: Any, *args: Any) -> Any:
+            return function(*args)
+
+        return pass_context(wrapper)
+
+    def _get_cached(self, cache_key: tuple, compute: Callable, *args: Any) -> Any:
+        version = self._coordinator.version
+
+        if self._cache_version != version:
+            self._cache = {}
+            self._cache_version = version
+
+        if cache_key not in self._cache:
+            self._cache[cache_key] = compute(*args)
+
+        return self._cache[cache_key]
+
+    def _get_area_id(self, area_id_or_name: str) -> str | None:
+        areas = self._coordinator.areas
+
+        if area_id_or_name in areas:
+            return area_id_or_name
+
+        area_ids = self._get_cached((ATTR_NAME,), self._get_area_ids_by_name)
+
+        area_id = area_ids.get(str(area_id_or_name).lower())
+
+        return area_id
+
+    def _get_area_ids_by_name(self) -> dict[str, str]:
+        areas = self._coordinator.areas
+
+        result = {
+            areas[area_id].get(ATTR_NAME, "").lower(): area_id for area_id in areas
+        }
+
+        return result
+
+    def _get_nested_areas(self, area_id_or_name: str) -> tuple[str, ...]:
+        area_id = self._get_area_id(area_id_or_name)
+
+        if area_id is None:
+            return ()
+
+        area = self._coordinator.areas.get(area_id)
+
+        result = tuple(area.get(ATTR_NESTED, []))
+
+        return result
+
+    def _get_nested_area_entities(self, area_id_or_name: str) -> tuple[str, ...]:
+        area_id = self._get_area_id(area_id_or_name)
+
+        if area_id is None:
+            return ()
+
+        area_ids = [area_id, *self._get_nested_areas(area_id)]
+
+        entity_ids = []
+
+        for lookup_area_id in area_ids:
+            entity_ids.extend(self._coordinator.get_area_entity_ids(lookup_area_id))
+
+        result = tuple(entity_ids)
+
+        return result
+
+    def _get_area_attribute(self, area_id_or_name: str, attribute: str) -> Any:
+        area_id = self._get_area_id(area_id_or_name)
+
+        if area_id is None:
+            return None
+
+        result = self._coordinator.config_manager.get_area_details(area_id, attribute)
+
+        return result
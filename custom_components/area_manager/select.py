@@ -48,17 +48,39 @@ class HASelectEntity(IntegrationBaseEntity, SelectEntity):
         self._attr_device_class = entity_description.device_class
         self._attr_current_option = None
         self._attr_options = entity_description.options
+        self._area_names_version: int | None = None
 
         self._set_parent_context()
 
     @callback
     def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
+        """Handle updated data from the coordinator, written only when changed."""
+        current_option = self._attr_current_option
+        options = self._attr_options
 
         self._set_parent_context()
 
+        if (
+            self._attr_current_option == current_option
+            and self._attr_options == options
+        ):
+            return
+
         self.async_write_ha_state()
 
+    @callback
+    def _handle_area_renamed(self, entry_id: str, area_id: str):
+        """Area names of the parent options are reloaded on any area rename."""
+        if (
+            self.entity_description.key == ATTR_PARENT
+            and self.coordinator.config_manager.entry_id == entry_id
+        ):
+            self._area_names_version = None
+
+            self._handle_coordinator_update()
+
+        super()._handle_area_renamed(entry_id, area_id)
+
     def _set_parent_context(self):
         try:
             if self.entity_description.key == ATTR_PARENT:
@@ -69,6 +91,10 @@ class HASelectEntity(IntegrationBaseEntity, SelectEntity):
                     else self.coordinator.get_area_name(parent_area_id)
                 )
 
+                if self._area_names_version != self.coordinator.version:
+                    self._area_names_version = self.coordinator.version
+                    self._attr_options = self.coordinator.get_area_names()
+
                 self._attr_current_option = parent_area_name
 
             else:
@@ -4,14 +4,15 @@ Support for sensor
 from __future__ import annotations
 
 import logging
+from typing import Any
 
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import ATTR_NAME, ATTR_STATE, Platform
+from homeassistant.const import ATTR_AREA_ID, Platform
 from homeassistant.core import HomeAssistant, callback
 
-from .common.base_entity import IntegrationBaseEntity, async_setup_base_entry
-from .common.consts import ATTR_ATTRIBUTES, DOMAIN
+from .common.base_entity import IntegrationAggregateEntity, async_setup_base_entry
+from .common.consts import ATTR_AREAS, DOMAIN
 from .common.entity_descriptions import HASensorEntityDescription
 from .managers.ha_coordinator import HACoordinator
 
@@ -32,7 +33,7 @@ async def async_setup_entry(
     )
 
 
-class HASensorEntity(IntegrationBaseEntity, SensorEntity):
+class HASensorEntity(IntegrationAggregateEntity, SensorEntity):
     """Representation of a sensor."""
 
     def __init__(
@@ -44,31 +45,48 @@ class HASensorEntity(IntegrationBaseEntity, SensorEntity):
     ):
         super().__init__(hass, entity_description, coordinator, area_id)
 
+        self._matching_areas_version: int | None = None
+
     @callback
     def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        attributes = {"generated_by": DOMAIN}
+        """Handle updated data from the coordinator.
 
-        entities = self.coordinator.get_related_entities(
-            self.area_id, self.entity_description
-        )
+        Matching areas change only with the configuration or the registries,
+        updates of the aggregates (same data version) are skipped.
+        """
+        if self.area_id is None:
+            if self._matching_areas_version != self.coordinator.version:
+                self._matching_areas_version = self.coordinator.version
+
+                self._set_matching_areas({"generated_by": DOMAIN})
 
-        native_value = None
+            return
 
-        for entity in entities:
-            entity_state = entity.get(ATTR_STATE)
-            entity_name = entity.get(ATTR_NAME)
-            entity_attributes = entity.get(ATTR_ATTRIBUTES)
+        super()._handle_coordinator_update()
+
+    def _set_state(self, state: Any, details: dict[str, Any]):
+        self._attr_native_value = state
+
+    def _set_matching_areas(self, attributes: dict):
+        matching_area_ids = self.coordinator.get_area_ids_by_attributes(
+            self.entity_description.attributes
+        )
 
-            attributes[entity_name] = entity_state.state
+        area_ids = [
+            area_id
+            for area_id in self.coordinator.areas
+            if area_id in matching_area_ids
+        ]
 
-            if native_value is None:
-                if entity_attributes is not None:
-                    attributes.update(entity_attributes)
+        attributes[ATTR_AREA_ID] = area_ids
+        attributes[ATTR_AREAS] = [
+            self.coordinator.get_area_name(area_id) for area_id in area_ids
+        ]
 
-                native_value = entity_state.state
+        if attributes == getattr(self, "_attr_extra_state_attributes", None):
+            return
 
-        self._attr_native_value = native_value
+        self._attr_native_value = len(area_ids)
         self._attr_extra_state_attributes = attributes
 
         self.async_write_ha_state()
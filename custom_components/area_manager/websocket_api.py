@@ -0,0 +1,173 @@
+"""
+Support for websocket commands.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+import logging
+from typing import Any
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from .common.consts import (
+    ATTR_AGGREGATES,
+    DOMAIN,
+    EVENT_DATA_CHANGES,
+    QUERY_ACTIVITY,
+    QUERY_AREAS,
+    QUERY_FILTERS_SCHEMA,
+    QUERY_MEMBERS,
+    QUERY_RULES,
+    SIGNAL_INTEGRATION_LOADED,
+    SUBSCRIBE_AGGREGATES_SCHEMA,
+    WS_COMMAND_ACTIVITY,
+    WS_COMMAND_AREAS,
+    WS_COMMAND_MEMBERS,
+    WS_COMMAND_RULES,
+    WS_COMMAND_SUBSCRIBE_AGGREGATES,
+)
+from .managers.ha_coordinator import HACoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant):
+    websocket_api.async_register_command(hass, websocket_query_areas)
+    websocket_api.async_register_command(hass, websocket_query_members)
+    websocket_api.async_register_command(hass, websocket_query_rules)
+    websocket_api.async_register_command(hass, websocket_query_activity)
+    websocket_api.async_register_command(hass, websocket_subscribe_aggregates)
+
+
+@websocket_api.websocket_command({"type": WS_COMMAND_AREAS, **QUERY_FILTERS_SCHEMA})
+@callback
+def websocket_query_areas(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict
+):
+    _send_query_result(hass, connection, msg, QUERY_AREAS)
+
+
+@websocket_api.websocket_command({"type": WS_COMMAND_MEMBERS, **QUERY_FILTERS_SCHEMA})
+@callback
+def websocket_query_members(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict
+):
+    _send_query_result(hass, connection, msg, QUERY_MEMBERS)
+
+
+@websocket_api.websocket_command({"type": WS_COMMAND_RULES, **QUERY_FILTERS_SCHEMA})
+@callback
+def websocket_query_rules(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict
+):
+    _send_query_result(hass, connection, msg, QUERY_RULES)
+
+
+@websocket_api.websocket_command({"type": WS_COMMAND_ACTIVITY, **QUERY_FILTERS_SCHEMA})
+@callback
+def websocket_query_activity(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict
+):
+    _send_query_result(hass, connection, msg, QUERY_ACTIVITY)
+
+
+@websocket_api.websocket_command(
+    {"type": WS_COMMAND_SUBSCRIBE_AGGREGATES, **SUBSCRIBE_AGGREGATES_SCHEMA}
+)
+@callback
+def websocket_subscribe_aggregates(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict
+):
+    """Send the matching aggregates, then only the changed ones once per batch.
+
+    The subscription follows reloads of the integration, a new set of
+    aggregates is sent once reloaded.
+    """
+    coordinator = get_coordinator(hass)
+
+    if coordinator is None:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, f"{DOMAIN} is not loaded"
+        )
+
+        return
+
+    remove_aggregates_listeners: list[Callable[[], None]] = []
+
+    @callback
+    def _send_changes(items: list[dict[str, Any]]):
+        connection.send_message(
+            websocket_api.event_message(msg["id"], {EVENT_DATA_CHANGES: items})
+        )
+
+    @callback
+    def _subscribe(*_args):
+        current_coordinator = get_coordinator(hass)
+
+        for remove_listener in remove_aggregates_listeners:
+            remove_listener()
+
+        remove_aggregates_listeners.clear()
+
+        if current_coordinator is None:
+            return
+
+        remove_aggregates_listeners.append(
+            current_coordinator.subscribe_aggregates(msg, _send_changes)
+        )
+
+        connection.send_message(
+            websocket_api.event_message(
+                msg["id"], {ATTR_AGGREGATES: current_coordinator.get_aggregates(msg)}
+            )
+        )
+
+    remove_dispatcher_listener = async_dispatcher_connect(
+        hass, SIGNAL_INTEGRATION_LOADED, _subscribe
+    )
+
+    @callback
+    def _unsubscribe():
+        remove_dispatcher_listener()
+
+        for remove_listener in remove_aggregates_listeners:
+            remove_listener()
+
+    connection.subscriptions[msg["id"]] = _unsubscribe
+
+    connection.send_result(msg["id"])
+
+    _subscribe()
+
+
+@callback
+def _send_query_result(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+    query: str,
+):
+    coordinator = get_coordinator(hass)
+
+    if coordinator is None:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, f"{DOMAIN} is not loaded"
+        )
+
+        return
+
+    result = coordinator.query(query, msg)
+
+    connection.send_result(msg["id"], result)
+
+
+@callback
+def get_coordinator(hass: HomeAssistant) -> HACoordinator | None:
+    coordinators = hass.data.get(DOMAIN, {})
+
+    coordinator = next(iter(coordinators.values()), None)
+
+    return coordinator